@@ -0,0 +1,84 @@
+import hashlib
+import json
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalResponse(Exception):
+    """Carries a 304 or 412 response out of the view's initial checks"""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def digest_etag(*parts) -> str:
+    """ETag of JSON serializable parts, e.g. ids and versions of a page"""
+    data = json.dumps(parts, default=str, separators=(",", ":"))
+    return quote_etag(hashlib.sha1(data.encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """Conditional GET (ETag / Last-Modified) for API views.
+
+    ``get_validators`` returns an ETag and a Last-Modified timestamp in
+    seconds, either may be None. They must be cheap to compute, they are
+    checked after authentication and permissions but before the handler
+    runs, and requests with matching If-None-Match or If-Modified-Since
+    get a 304 without a body. Successful responses carry the validators
+    and are marked private and to be revalidated on every use.
+    """
+
+    etag = None
+    last_modified = None
+
+    def get_validators(self) -> tuple[str | None, int | None]:
+        return None, None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ("GET", "HEAD"):
+            return
+        self.etag, self.last_modified = self.get_validators()
+        if self.etag is None and self.last_modified is None:
+            return
+        output_format = request.accepted_renderer.format
+        if self.etag is not None and output_format != "json":
+            # every format of a resource is a representation of its own
+            self.etag = digest_etag(self.etag, output_format)
+        response = get_conditional_response(
+            request._request,
+            etag=self.etag,
+            last_modified=self.last_modified
+        )
+        if response is not None:
+            raise ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request,
+            response,
+            *args,
+            **kwargs
+        )
+        if response.status_code in (200, 304) and (
+            self.etag is not None or self.last_modified is not None
+        ):
+            if self.etag is not None:
+                response.headers["ETag"] = self.etag
+            if self.last_modified is not None:
+                response.headers["Last-Modified"] = http_date(
+                    self.last_modified
+                )
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("Authorization",))
+        return response
@@ -1,19 +1,239 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
 
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Cast
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-class CommentaryPagination(PageNumberPagination):
+
+def cursor_rank(expression=None):
+    """Float search rank to order and paginate on, constant without
+    an expression (databases without ranked search)"""
+    if expression is None:
+        return Value(0.0, output_field=FloatField())
+    # PostgreSQL ranks are real, cast to double so a rank stored in a
+    # cursor compares equal to the value it was read from
+    return Cast(expression, FloatField())
+
+
+class KeysetPagination(BasePagination):
+    """Opaque cursor pagination over a unique ordering (keyset pagination).
+
+    The cursor holds the ordering values of the last row of a page and the
+    next page is selected with a range condition on them, so any page costs
+    one indexed scan of page_size rows, without OFFSET or COUNT(*).
+    Views may override the ordering with a ``cursor_ordering`` attribute,
+    the last field of the ordering must be unique.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    ordering = ("-created_time", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    iterator_chunk_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.prepare(request, view)
+        return self.paginate_list(list(self.page_queryset(queryset)))
+
+    def paginate_queryset_iterator(self, queryset, request, view=None):
+        """Rows of one page read in chunks, has_next and the next position
+        are known once the iterator is exhausted"""
+        self.prepare(request, view)
+        self.has_next = False
+        self.next_position = None
+        return self.iterate_page(
+            self.page_queryset(queryset).iterator(
+                chunk_size=self.iterator_chunk_size
+            )
+        )
+
+    def iterate_page(self, items):
+        last = None
+        for count, item in enumerate(items):
+            if count == self.page_size:
+                self.has_next = True
+                self.next_position = self.get_position(last)
+                return
+            last = item
+            yield item
+
+    def page_queryset(self, queryset):
+        """Rows after the cursor in ordering order, limited to page_size + 1"""
+        queryset = queryset.order_by(*self.ordering)
+        if self.position is not None:
+            self.position = self.coerce_position(queryset)
+            queryset = queryset.filter(self.get_position_filter())
+        return queryset[:self.page_size + 1]
+
+    def prepare(self, request, view=None):
+        """Read page size, ordering and cursor position of the request"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = (
+            getattr(view, "cursor_ordering", None) or self.ordering
+        )
+        self.position = self.decode_cursor(request)
+
+    def paginate_list(self, items):
+        """Cut rows fetched with a page_size + 1 limit down to one page"""
+        self.has_next = len(items) > self.page_size
+        page = items[:self.page_size]
+        self.next_position = (
+            self.get_position(page[-1]) if self.has_next else None
+        )
+        return page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_position(self, item):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            if isinstance(item, dict):
+                values.append(item[name])
+            else:
+                values.append(getattr(item, name))
+        return values
+
+    @staticmethod
+    def get_ordering_field(queryset, name):
+        """Model field or annotation output field an ordering name reads"""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    def coerce_position(self, queryset):
+        """Cursor values converted and validated by their ordering fields"""
+        position = []
+        for field, value in zip(self.ordering, self.position):
+            field = self.get_ordering_field(queryset, field.lstrip("-"))
+            try:
+                if value is None:
+                    raise ValueError
+                value = field.to_python(value)
+                field.run_validators(value)
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+            position.append(value)
+        return position
+
+    def get_position_filter(self):
+        """Rows strictly after the cursor position in ordering order"""
+        after = Q()
+        for index, field in enumerate(self.ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition = Q(
+                **{f"{field.lstrip('-')}__{lookup}": self.position[index]}
+            )
+            for previous, value in zip(self.ordering[:index], self.position):
+                condition &= Q(**{previous.lstrip("-"): value})
+            after |= condition
+
+        first = self.ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{bound}": self.position[0]}) & after
+
+    @staticmethod
+    def encode_value(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+    def encode_cursor(self, position):
+        data = json.dumps(position, default=self.encode_value)
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+    def get_streamed_page(self, results):
+        """Page for StreamingJSONRenderer, next is read after the results"""
+        return {
+            "results": results,
+            "next": self.get_next_link,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+
+class PostPagination(KeysetPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class CommentaryPagination(KeysetPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 1000
 
 
-class UserProfilesPagination(PageNumberPagination):
+class UserProfilesPagination(KeysetPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 1000
+    ordering = ("id", )
 
 
-class FollowingPagination(PageNumberPagination):
+class FollowingPagination(KeysetPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 1000
+    ordering = ("-created", "-id")
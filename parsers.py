@@ -0,0 +1,15 @@
+import msgpack
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read())
+        except (ValueError, TypeError) as exc:
+            raise ParseError(
+                f"MessagePack parse error - {str(exc) or type(exc).__name__}"
+            )
@@ -0,0 +1,30 @@
+from django.db.models import Expression
+from rest_framework import serializers
+
+
+class ValuesSerializer(serializers.Serializer):
+    """Read-only serializer of the plain rows of a values() query.
+
+    ``columns`` maps every output key to the lookup or expression it is
+    read from and ``project`` selects exactly those columns, so no model
+    instances are built and no field conversion runs per row. Declared
+    fields only document the output for the schema.
+    """
+
+    columns: dict = {}
+
+    @classmethod
+    def project(cls, queryset):
+        lookups, expressions = [], {}
+        for key, column in cls.columns.items():
+            if isinstance(column, Expression):
+                expressions[key] = column
+            else:
+                lookups.append(column)
+        return queryset.values(*lookups, **expressions)
+
+    def to_representation(self, row):
+        return {
+            key: row[key if isinstance(column, Expression) else column]
+            for key, column in self.columns.items()
+        }
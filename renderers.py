@@ -0,0 +1,164 @@
+"""JSON renderers for large API responses.
+
+FastJSONRenderer writes the same compact JSON as DRF's JSONRenderer. It
+encodes with orjson when that is installed, and falls back to the
+standard json module when it is missing, when indented output is asked
+for or when orjson cannot encode the data.
+
+StreamingJSONRenderer is selected with ``?format=stream``. List views
+with StreamingListMixin then answer with a StreamingHttpResponse that
+reads, serializes and sends the rows of a page one by one in chunks of
+chunk_size bytes, so memory does not grow with the page size. The next
+link follows the results there, it is only known once they were read.
+Once streaming has started an error can only cut the response short.
+
+MessagePackRenderer answers requests that accept application/msgpack
+with the same data encoded by the msgpack package, datetimes as integer
+milliseconds since the epoch. Serializers leave datetimes to the
+renderer (DATETIME_FORMAT is None), so no second pass over the data is
+needed for that.
+"""
+import json
+from collections.abc import Iterator
+from datetime import datetime
+
+import msgpack
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def encode(self, data) -> bytes:
+        """Compact JSON of data, like JSONRenderer without indentation"""
+        if orjson is not None and self.compact and not self.ensure_ascii:
+            try:
+                ret = orjson.dumps(
+                    data,
+                    default=self.encoder_class().default,
+                    option=orjson.OPT_PASSTHROUGH_DATETIME
+                )
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                # JSONRenderer escapes the line separators for JavaScript
+                ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                    b"\xe2\x80\xa9",
+                    b"\\u2029"
+                )
+                return ret
+        ret = json.dumps(
+            data,
+            cls=self.encoder_class,
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict,
+            separators=(",", ":") if self.compact else (", ", ": ")
+        )
+        ret = ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+        return ret.encode()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return self.encode(data)
+
+
+class StreamingJSONRenderer(FastJSONRenderer):
+    format = "stream"
+    chunk_size = 64 * 1024
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return b"".join(self.stream(data))
+
+    def stream(self, data) -> Iterator[bytes]:
+        """JSON of data in chunks of about chunk_size bytes"""
+        buffer = bytearray()
+        for part in self.parts(data):
+            buffer += part
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    def parts(self, data) -> Iterator[bytes]:
+        """Iterator values of a dict are encoded item by item, callable
+        values are called when their turn comes"""
+        if not isinstance(data, dict):
+            yield self.encode(data)
+            return
+        yield b"{"
+        for index, (key, value) in enumerate(data.items()):
+            yield (b"," if index else b"") + self.encode(str(key)) + b":"
+            if callable(value):
+                value = value()
+            if isinstance(value, Iterator):
+                yield b"["
+                for position, item in enumerate(value):
+                    yield (b"," if position else b"") + self.encode(item)
+                yield b"]"
+            else:
+                yield self.encode(value)
+        yield b"}"
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=self.default)
+
+    @staticmethod
+    def default(value):
+        """Datetimes as epoch milliseconds, other types as in JSON"""
+        if isinstance(value, datetime):
+            return round(value.timestamp() * 1000)
+        return JSONEncoder().default(value)
+
+
+def is_streaming(request) -> bool:
+    return isinstance(
+        getattr(request, "accepted_renderer", None),
+        StreamingJSONRenderer
+    )
+
+
+class StreamingListMixin:
+    """Stream paginated lists when the stream format was negotiated"""
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is None or not is_streaming(request):
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_serializer()
+        return self.stream_page(
+            map(serializer.to_representation, self.iterate_page())
+        )
+
+    def iterate_page(self) -> Iterator:
+        return self.paginator.paginate_queryset_iterator(
+            self.filter_queryset(self.get_queryset()),
+            self.request,
+            self
+        )
+
+    def stream_page(self, results: Iterator) -> StreamingHttpResponse:
+        return StreamingHttpResponse(
+            self.request.accepted_renderer.stream(
+                self.paginator.get_streamed_page(results)
+            ),
+            content_type=self.request.accepted_renderer.media_type
+        )
@@ -0,0 +1,20 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Post versions and locks only work in a cache shared by processes"""
+    if isinstance(caches["default"], LocMemCache):
+        return [
+            Warning(
+                "The default cache is kept in the memory of each process.",
+                hint=(
+                    "Set REDIS_URL when running more than one process, "
+                    "or processes serve outdated posts and ETags."
+                ),
+                id="social_media.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,78 @@
+"""Stored like and comment counters of posts.
+
+``Post.likes_count`` and ``Post.comments_count`` are maintained with atomic
+``F()`` updates next to every write of a like or comment, ``actual_likes``
+and ``actual_comments`` recount them from the rows for reconciliation.
+
+With ``LIKE_COUNTER_MODE = "buffered"`` likes do not touch the post row at
+all. Each change appends a ``PostLikeDelta`` and ``flush_like_deltas``
+folds them into ``likes_count`` in batches, so a viral post stops being a
+single-row lock hotspot. ``Post.objects`` adds the pending deltas to reads.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from social_media.models import Commentary, Like, Post, PostLikeDelta
+
+
+def change_likes(post_id: int, delta: int) -> None:
+    if settings.LIKE_COUNTER_MODE == "buffered":
+        PostLikeDelta.objects.create(post_id=post_id, delta=delta)
+        return
+    Post.objects.filter(pk=post_id).update(
+        likes_count=F("likes_count") + delta
+    )
+
+
+def flush_like_deltas(batch_size: int = 10000) -> int:
+    """Fold one batch of pending like deltas into the post counters.
+
+    Only the fetched rows are deleted, deltas committed meanwhile are left
+    for the next batch. Returns the number of folded deltas.
+    """
+    with transaction.atomic():
+        deltas = list(
+            PostLikeDelta.objects.order_by("id")
+            .values_list("id", "post_id", "delta")[:batch_size]
+        )
+        totals = Counter()
+        for _, post_id, delta in deltas:
+            totals[post_id] += delta
+        for post_id, delta in sorted(totals.items()):
+            if delta:
+                Post.objects.filter(pk=post_id).update(
+                    likes_count=F("likes_count") + delta
+                )
+        PostLikeDelta.objects.filter(
+            id__in=[delta_id for delta_id, _, _ in deltas]
+        ).delete()
+    return len(deltas)
+
+
+def change_comments(post_id: int, delta: int) -> None:
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F("comments_count") + delta
+    )
+
+
+def _count_rows(model):
+    rows = (
+        model.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def actual_likes():
+    return _count_rows(Like)
+
+
+def actual_comments():
+    return _count_rows(Commentary)
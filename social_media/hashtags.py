@@ -0,0 +1,28 @@
+"""Parsing of post hashtags and lookup of their PostHashtags rows"""
+import re
+
+from social_media.models import PostHashtags
+
+HASHTAG_MAX_LENGTH = 20
+HASHTAG_PATTERN = re.compile(r"#?(\w+)")
+
+
+def parse_hashtags(text: str | None) -> list[str]:
+    """Normalized tags of text like "#tag1, #Tag2" without duplicates"""
+    tags = []
+    for tag in HASHTAG_PATTERN.findall(text or ""):
+        tag = tag.lower()
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def get_tags(names: list[str]) -> list[PostHashtags]:
+    """PostHashtags rows for names, creating the missing ones"""
+    if not names:
+        return []
+    PostHashtags.objects.bulk_create(
+        [PostHashtags(hashtag=name) for name in names],
+        ignore_conflicts=True
+    )
+    return list(PostHashtags.objects.filter(hashtag__in=names))
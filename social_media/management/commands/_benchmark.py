@@ -0,0 +1,57 @@
+"""Helpers shared by the benchmark management commands"""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from user.models import User, UserProfile
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def create_profiles(count: int, prefix: str = "bench") -> list[int]:
+    """Bulk create users with profiles and return the profile ids"""
+    users = User.objects.bulk_create(
+        [
+            User(email=f"{prefix}-{index}@benchmark.local")
+            for index in range(count)
+        ],
+        batch_size=5000
+    )
+    profiles = UserProfile.objects.bulk_create(
+        [
+            UserProfile(
+                email=user,
+                first_name=f"{prefix}{index}",
+                last_name="benchmark"
+            )
+            for index, user in enumerate(users)
+        ],
+        batch_size=5000
+    )
+    return [profile.id for profile in profiles]
+
+
+def timed(func, repeat: int = 1) -> list[float]:
+    """Call func repeat times and return the duration of every call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summary(samples: list[float]) -> str:
+    """Format durations as mean and p95 in milliseconds"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (f"mean {statistics.mean(ordered) * 1000:8.2f} ms, "
+            f"p95 {p95 * 1000:8.2f} ms")
@@ -0,0 +1,130 @@
+import statistics
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.throttling import SimpleRateThrottle
+
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    timed,
+)
+from social_media.models import Like, Post, TimelineEntry
+from user.models import User, UserFollowing, UserProfile
+
+
+class Command(BaseCommand):
+    """Django command to compare app startup requests with one batch"""
+
+    help = (
+        "Time the requests of an app start one by one and as one "
+        "/api/batch/ call, on generated data that is committed, since "
+        "batched reads run in other threads, and deleted afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--rtt-ms",
+            type=float,
+            default=50,
+            help="Network round trip added to every HTTP call estimate"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            # throttles still run, but must not stop the benchmark
+            with mock.patch.dict(
+                SimpleRateThrottle.THROTTLE_RATES,
+                {"user": "1000000/day"}
+            ):
+                self.run(options)
+        finally:
+            User.objects.filter(
+                email__startswith="batch-",
+                email__endswith="@benchmark.local"
+            ).delete()
+
+    def run(self, options):
+        profile_id, *others = create_profiles(51, "batch")
+        profile = UserProfile.objects.select_related("email").get(
+            pk=profile_id
+        )
+        token = Token.objects.create(user=profile.email)
+        UserFollowing.objects.bulk_create(
+            UserFollowing(your_followers_id=profile_id, you_follow_to_id=other)
+            for other in others
+        )
+        UserFollowing.objects.bulk_create(
+            UserFollowing(your_followers_id=other, you_follow_to_id=profile_id)
+            for other in others[:20]
+        )
+        posts = Post.objects.bulk_create(
+            Post(author_id=author, title="batch", content="startup")
+            for author in [profile_id] * 20 + others * 2
+        )
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(
+                owner_id=profile_id,
+                post_id=post.id,
+                created_time=post.created_time
+            )
+            for post in posts
+            if post.author_id != profile_id
+        )
+        Like.objects.bulk_create(
+            Like(user_id=profile_id, post_id=post.id) for post in posts[20:40]
+        )
+
+        paths = [
+            reverse("user:profile"),
+            reverse("user:followers"),
+            reverse("user:followings"),
+            reverse("social:following-post"),
+            reverse("social:your-post"),
+            reverse("social:liked"),
+            reverse("social:trending-hashtags"),
+            reverse("user:users-list"),
+        ]
+        # outside INTERNAL_IPS, the debug toolbar would dominate
+        client = Client(
+            REMOTE_ADDR="192.0.2.1",
+            HTTP_AUTHORIZATION=f"Token {token.key}"
+        )
+
+        def one_by_one():
+            for path in paths:
+                assert client.get(path).status_code == 200
+
+        def batched():
+            response = client.post(
+                reverse("batch"),
+                [{"method": "GET", "path": path} for path in paths],
+                content_type="application/json"
+            )
+            assert response.status_code == 200
+            assert all(item["status"] == 200 for item in response.json())
+
+        one_by_one()
+        batched()
+        cases = [(
+            "one by one",
+            statistics.median(timed(one_by_one, options["repeat"])),
+            len(paths)
+        )]
+        for workers in (1, 4):
+            with override_settings(BATCH_MAX_WORKERS=workers):
+                median = statistics.median(timed(batched, options["repeat"]))
+            cases.append((f"batch, {workers} worker(s)", median, 1))
+        rtt = options["rtt_ms"] / 1000
+        self.stdout.write(
+            f"{len(paths)} startup requests, "
+            f"estimates with a {options['rtt_ms']:.0f} ms round trip"
+        )
+        for name, median, calls in cases:
+            self.stdout.write(
+                f"{name:<20} server {median * 1000:8.2f} ms   "
+                f"with round trips {(median + calls * rtt) * 1000:8.2f} ms"
+            )
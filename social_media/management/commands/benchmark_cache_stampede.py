@@ -0,0 +1,162 @@
+import multiprocessing
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+
+from social_media import post_cache
+from social_media.management.commands._benchmark import summary
+
+
+class StampedePostSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    content = serializers.CharField()
+
+
+class Command(BaseCommand):
+    """Django command to check concurrent cache misses of one hot post"""
+
+    help = (
+        "Let many threads, and processes with a shared cache, read one "
+        "post at the same moment its cached rendering is invalidated or "
+        "expires. Fail unless it was rendered exactly once per round and "
+        "only the renderer waited when a stale rendering could be served "
+        "(no database access)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=50)
+        parser.add_argument("--processes", type=int, default=1)
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument(
+            "--render-ms",
+            type=int,
+            default=50,
+            help="Simulated time of one rendering"
+        )
+        parser.add_argument("--post-id", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options["processes"] > 1 and isinstance(cache, LocMemCache):
+            raise CommandError(
+                "Several processes need a shared CACHES backend"
+            )
+        context = multiprocessing.get_context("fork")
+        parties = options["threads"] * options["processes"]
+        self.post_id = options["post_id"]
+        self.render_seconds = options["render_ms"] / 1000
+        self.barrier = context.Barrier(parties)
+        self.renders = context.Array("i", options["rounds"])
+        self.waited = context.Array("i", options["rounds"])
+        self.round = context.Value("i", 0)
+        self.outcomes = context.Queue()
+
+        post_cache.invalidate(self.post_id)
+        processes = [
+            context.Process(target=self.run_process, args=(options,))
+            for _ in range(options["processes"] - 1)
+        ]
+        for process in processes:
+            process.start()
+        self.run_process(options)
+        for process in processes:
+            process.join()
+
+        outcomes = [
+            self.outcomes.get() for _ in range(options["processes"])
+        ]
+        failures = []
+        for number in range(options["rounds"]):
+            renders, waited = self.renders[number], self.waited[number]
+            if renders != 1:
+                failures.append(f"round {number} rendered {renders} times")
+            if self.expiry(number) == "expired" and waited > 1:
+                failures.append(
+                    f"round {number} made {waited} readers wait for a "
+                    f"stale post"
+                )
+            self.stdout.write(
+                f"round {number:>3} {self.expiry(number):<11} "
+                f"renders: {renders}, waited: {waited:>4}"
+            )
+        for name in ("hits", "stale", "coalesced", "misses"):
+            total = sum(stats[name] for stats, _ in outcomes)
+            self.stdout.write(f"{name:>9}: {total}")
+        latencies = [sample for _, samples in outcomes for sample in samples]
+        self.stdout.write(f"  latency: {summary(latencies)}")
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write(self.style.SUCCESS(
+            f"{parties} concurrent readers, one rendering per expiry, "
+            f"stale renderings served without waiting"
+        ))
+
+    @staticmethod
+    def expiry(number: int) -> str:
+        return "invalidated" if number % 2 == 0 else "expired"
+
+    def run_process(self, options):
+        post_cache.stats.reset()
+        samples = []
+        lock = threading.Lock()
+
+        def read():
+            for number in range(options["rounds"]):
+                if self.barrier.wait() == 0:
+                    self.round.value = number
+                    self.expire(number)
+                self.barrier.wait()
+                start = time.perf_counter()
+                post_cache.render(
+                    [self.post_id],
+                    StampedePostSerializer.__name__,
+                    self.serialize,
+                    self.load
+                )
+                elapsed = time.perf_counter() - start
+                with lock:
+                    samples.append(elapsed)
+                # served without waiting take a fraction of a rendering
+                if elapsed >= self.render_seconds / 2:
+                    with self.waited.get_lock():
+                        self.waited[number] += 1
+
+        workers = [
+            threading.Thread(target=read) for _ in range(options["threads"])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.outcomes.put((post_cache.stats.snapshot(), samples))
+
+    def expire(self, number: int) -> None:
+        """Invalidate the post or let its rendering go stale"""
+        if self.expiry(number) == "invalidated":
+            post_cache.invalidate(self.post_id)
+            return
+        key = post_cache.entry_key(
+            StampedePostSerializer.__name__,
+            self.post_id,
+            post_cache.versions([self.post_id])[self.post_id]
+        )
+        _, data = cache.get(key)
+        cache.set(
+            key,
+            (0.0, data),
+            settings.POST_CACHE_TTL + settings.POST_CACHE_STALE_SECONDS
+        )
+
+    @staticmethod
+    def serialize(posts):
+        return StampedePostSerializer(posts, many=True).data
+
+    def load(self, ids):
+        with self.renders.get_lock():
+            self.renders[self.round.value] += 1
+        time.sleep(self.render_seconds)
+        return [{"id": post_id, "content": "hot"} for post_id in ids]
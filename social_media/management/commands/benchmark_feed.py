@@ -0,0 +1,111 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from social_media import timeline
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    rolled_back,
+    summary,
+    timed,
+)
+from social_media.models import Post, TimelineEntry
+from user.models import UserFollowing, UserProfile
+
+
+class Command(BaseCommand):
+    """Django command to compare push, pull and hybrid feed assembly"""
+
+    help = (
+        "Measure timeline write amplification and feed read latency for "
+        "every FEED_MODE on generated data (rolled back afterwards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=200)
+        parser.add_argument("--authors", type=int, default=50)
+        parser.add_argument("--celebrities", type=int, default=2)
+        parser.add_argument("--follows", type=int, default=20)
+        parser.add_argument("--posts-per-author", type=int, default=10)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument(
+            "--threshold",
+            type=int,
+            help="Celebrity follower threshold (defaults to --readers)"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        with rolled_back():
+            readers, authors = self.build_graph(options)
+            for mode in ("push", "pull", "hybrid"):
+                with override_settings(
+                    FEED_MODE=mode,
+                    FEED_CELEBRITY_THRESHOLD=(
+                        options["threshold"] or options["readers"]
+                    )
+                ):
+                    timeline.pull_celebrities(authors)
+                    self.run_mode(mode, readers, authors, options)
+
+    def build_graph(self, options):
+        readers = create_profiles(options["readers"], "reader")
+        authors = create_profiles(options["authors"], "author")
+        celebrities = authors[:options["celebrities"]]
+        regular = authors[options["celebrities"]:]
+
+        follows = []
+        for reader in readers:
+            followed = celebrities + random.sample(
+                regular,
+                min(options["follows"], len(regular))
+            )
+            follows += [
+                UserFollowing(your_followers_id=reader, you_follow_to_id=a)
+                for a in followed
+            ]
+        UserFollowing.objects.bulk_create(follows, batch_size=5000)
+        for author in authors:
+            UserProfile.objects.filter(pk=author).update(
+                followers_count=UserFollowing.objects.filter(
+                    you_follow_to_id=author
+                ).count()
+            )
+        return readers, authors
+
+    def run_mode(self, mode, readers, authors, options):
+        TimelineEntry.objects.filter(owner_id__in=readers).delete()
+        posts = Post.objects.bulk_create(
+            [
+                Post(author_id=author, title="benchmark", content=mode)
+                for author in authors
+                for _ in range(options["posts_per_author"])
+            ],
+            batch_size=5000
+        )
+        posts = Post.objects.filter(
+            id__in=[post.id for post in posts]
+        ).select_related("author")
+
+        start = time.perf_counter()
+        for post in posts:
+            timeline.fan_out_post(post)
+        write_time = time.perf_counter() - start
+        rows = TimelineEntry.objects.filter(owner_id__in=readers).count()
+
+        sample = random.sample(readers, min(50, len(readers)))
+        reads = []
+        for reader in sample:
+            reads += timed(
+                lambda: timeline.read_feed(reader, options["page_size"])
+            )
+
+        self.stdout.write(
+            f"{mode:>6}: {rows / len(posts):7.2f} timeline rows per post, "
+            f"fan-out {write_time * 1000:9.2f} ms total, "
+            f"read {summary(reads)}"
+        )
+        Post.objects.filter(id__in=posts.values("id")).delete()
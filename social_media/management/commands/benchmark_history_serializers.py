@@ -0,0 +1,137 @@
+import random
+import statistics
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    rolled_back,
+    timed,
+)
+from social_media.models import Commentary, Like, Post
+from social_media.serializers import (
+    CommentaryHistorySerializer,
+    CommentaryListSerializer,
+    LikeHistorySerializer,
+    LikeSerializer,
+)
+from user.models import UserFollowing
+from user.serializers import (
+    FollowingHistorySerializer,
+    UserFollowingSerializer,
+)
+
+
+class Command(BaseCommand):
+    """Django command to compare model and values() history serializers"""
+
+    help = (
+        "Serialize pages of the comment, like and following history with "
+        "the ModelSerializer path and the values() fast path and report "
+        "rows per second (rolled back afterwards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20000)
+        parser.add_argument("--page-size", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        rows = options["rows"]
+        with rolled_back():
+            profiles = create_profiles(int(rows ** 0.5) + 2, "history")
+            posts = [
+                post.id for post in Post.objects.bulk_create(
+                    Post(
+                        author_id=random.choice(profiles),
+                        title="benchmark",
+                        content="history"
+                    )
+                    for _ in range(len(profiles))
+                )
+            ]
+            pairs = random.sample(
+                [(first, second) for first in profiles for second in posts],
+                rows
+            )
+            Commentary.objects.bulk_create(
+                (
+                    Commentary(user_id=user, post_id=post, content="history")
+                    for user, post in pairs
+                ),
+                batch_size=5000
+            )
+            Like.objects.bulk_create(
+                (Like(user_id=user, post_id=post) for user, post in pairs),
+                batch_size=5000
+            )
+            UserFollowing.objects.bulk_create(
+                (
+                    UserFollowing(
+                        your_followers_id=first,
+                        you_follow_to_id=second
+                    )
+                    for first, second in random.sample(
+                        [
+                            (first, second)
+                            for first in profiles for second in profiles
+                            if first != second
+                        ],
+                        rows
+                    )
+                ),
+                batch_size=5000
+            )
+
+            cases = [
+                (
+                    "comments-history",
+                    Commentary.objects.select_related("user", "post"),
+                    CommentaryListSerializer,
+                    CommentaryHistorySerializer,
+                    ("-created_time", "-id"),
+                ),
+                (
+                    "likes-history",
+                    Like.objects.select_related("user", "post"),
+                    LikeSerializer,
+                    LikeHistorySerializer,
+                    ("-created_time", "-id"),
+                ),
+                (
+                    "following-history",
+                    UserFollowing.objects.all(),
+                    UserFollowingSerializer,
+                    FollowingHistorySerializer,
+                    ("-created", "-id"),
+                ),
+            ]
+            page_size = options["page_size"]
+            self.stdout.write(
+                f"{'':<20}{'model rows/s':>14}{'values rows/s':>15}"
+                f"{'speedup':>9}"
+            )
+            for name, queryset, model_class, values_class, order in cases:
+                queryset = queryset.order_by(*order)
+
+                def model_path():
+                    page = list(queryset[:page_size])
+                    JSONRenderer().render(model_class(page, many=True).data)
+
+                def values_path():
+                    page = list(values_class.project(queryset)[:page_size])
+                    JSONRenderer().render(values_class(page, many=True).data)
+
+                model = statistics.median(
+                    timed(model_path, options["repeat"])
+                )
+                values = statistics.median(
+                    timed(values_path, options["repeat"])
+                )
+                self.stdout.write(
+                    f"{name:<20}{page_size / model:>14.0f}"
+                    f"{page_size / values:>15.0f}{model / values:>8.1f}x"
+                )
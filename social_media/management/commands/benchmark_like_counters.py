@@ -0,0 +1,71 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from social_media import counters
+from social_media.management.commands._benchmark import create_profiles
+from social_media.models import Post
+from user.models import User
+
+
+class Command(BaseCommand):
+    """Django command to hammer one post counter from parallel workers"""
+
+    help = (
+        "Compare like throughput on a single post for direct and buffered "
+        "LIKE_COUNTER_MODE. Needs a database with concurrent writers "
+        "(PostgreSQL), the generated rows are deleted afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=16)
+        parser.add_argument("--likes-per-worker", type=int, default=200)
+
+    def handle(self, *args, **options):
+        author = create_profiles(1, "like-counter")[0]
+        post = Post.objects.create(
+            author_id=author,
+            title="benchmark",
+            content="viral"
+        )
+        try:
+            for mode in ("direct", "buffered"):
+                with override_settings(LIKE_COUNTER_MODE=mode):
+                    self.run_mode(mode, post, options)
+        finally:
+            User.objects.filter(profile__id=author).delete()
+
+    def run_mode(self, mode, post, options):
+        Post.objects.filter(pk=post.pk).update(likes_count=0)
+        total = options["workers"] * options["likes_per_worker"]
+
+        def worker():
+            try:
+                for _ in range(options["likes_per_worker"]):
+                    with transaction.atomic():
+                        counters.change_likes(post.id, 1)
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["workers"]) as executor:
+            for future in [
+                executor.submit(worker) for _ in range(options["workers"])
+            ]:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        flush_start = time.perf_counter()
+        while counters.flush_like_deltas():
+            pass
+        flush_time = time.perf_counter() - flush_start
+
+        likes = Post.objects.get(pk=post.pk).total_likes
+        self.stdout.write(
+            f"{mode:>8}: {total / elapsed:10.0f} likes/s "
+            f"({total} likes, {options['workers']} workers), "
+            f"flush {flush_time * 1000:.2f} ms, counter {likes}"
+        )
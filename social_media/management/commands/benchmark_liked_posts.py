@@ -0,0 +1,136 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from pagination import PostPagination
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    rolled_back,
+    summary,
+    timed,
+)
+from social_media.models import Like, Post
+from social_media.views import LikedPostView
+from user.models import UserProfile
+
+
+def id_list_queryset(profile_id):
+    """The liked posts query before the join, ids collected in Python"""
+    liked = UserProfile.objects.get(id=profile_id).likes.all()
+    ids = [like.post_id for like in liked]
+    return Post.objects.filter(id__in=ids)
+
+
+def page_rows(queryset):
+    """Columns the post list views paginate on"""
+    return queryset.select_related(None).prefetch_related(None).only(
+        "id",
+        "created_time"
+    )
+
+
+class Command(BaseCommand):
+    """Django command to compare liked post queries"""
+
+    help = (
+        "Measure first and deep pages of the liked posts of a user with "
+        "many likes, with the list of liked ids and with the join through "
+        "likes ordered by like time (rolled back afterwards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--likes", type=int, default=100000)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        page_size = options["page_size"]
+        factory = RequestFactory()
+        with rolled_back():
+            liker, other = create_profiles(2, "liked")
+            posts = [
+                post.id for post in Post.objects.bulk_create(
+                    (
+                        Post(
+                            author_id=other,
+                            title="benchmark",
+                            content="like"
+                        )
+                        for _ in range(options["likes"])
+                    ),
+                    batch_size=5000
+                )
+            ]
+            # liked in an order unrelated to the post order
+            random.shuffle(posts)
+            Like.objects.bulk_create(
+                (Like(user_id=liker, post_id=post) for post in posts),
+                batch_size=5000
+            )
+            Like.objects.bulk_create(
+                (Like(user_id=other, post_id=post) for post in posts),
+                batch_size=5000
+            )
+
+            profile = UserProfile.objects.select_related("email").get(
+                id=liker
+            )
+            user = profile.email
+            user.profile = profile
+            last_page = options["likes"] // page_size
+
+            pages = sorted({1, 100, last_page})
+            for page in (page for page in pages if page <= last_page):
+                params = {"page_size": page_size}
+                if page > 1:
+                    params["cursor"] = self.cursor(
+                        id_list_queryset(liker).order_by(
+                            *PostPagination.ordering
+                        ).values_list("created_time", "id"),
+                        (page - 1) * page_size - 1
+                    )
+                request = Request(factory.get("/", params))
+                request.user = user
+                try:
+                    before = summary(timed(
+                        lambda: PostPagination().paginate_queryset(
+                            page_rows(id_list_queryset(liker)),
+                            request
+                        ),
+                        options["repeat"]
+                    ))
+                except DatabaseError as error:
+                    before = f"failed: {error}"
+
+                view = LikedPostView(request=request, format_kwarg=None)
+                params = {"page_size": page_size}
+                if page > 1:
+                    params["cursor"] = self.cursor(
+                        view.get_queryset().order_by(
+                            *view.cursor_ordering
+                        ).values_list("liked_at", "like_id"),
+                        (page - 1) * page_size - 1
+                    )
+                request = Request(factory.get("/", params))
+                request.user = user
+                view = LikedPostView(request=request, format_kwarg=None)
+                after = summary(timed(
+                    lambda: PostPagination().paginate_queryset(
+                        page_rows(view.get_queryset()),
+                        request,
+                        view
+                    ),
+                    options["repeat"]
+                ))
+                self.stdout.write(
+                    f"page {page:>6}: id list {before} | join {after}"
+                )
+
+    @staticmethod
+    def cursor(positions, index):
+        return PostPagination().encode_cursor(list(positions[index]))
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    rolled_back,
+    summary,
+    timed,
+)
+from social_media.models import Like, Post
+from social_media.views import like_post, unlike_post
+from user.models import UserProfile
+
+
+class Command(BaseCommand):
+    """Django command to measure like/unlike latency by post popularity"""
+
+    help = (
+        "Time like and unlike on posts that already have N likes, next to "
+        "the old membership check that loaded every like (rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[10, 1000, 100000],
+            help="Existing likes per post, e.g. --sizes 10 1000000"
+        )
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            likers = create_profiles(max(options["sizes"]), "liker")
+            visitor = UserProfile.objects.get(
+                pk=create_profiles(1, "visitor")[0]
+            )
+            request = SimpleNamespace(user=SimpleNamespace(profile=visitor))
+
+            for size in sorted(options["sizes"]):
+                post = Post.objects.create(
+                    author_id=likers[0],
+                    title="benchmark",
+                    content="likes"
+                )
+                Like.objects.bulk_create(
+                    (Like(user_id=user, post=post) for user in likers[:size]),
+                    batch_size=5000
+                )
+
+                cycle = timed(
+                    lambda: (
+                        like_post(request, pk=post.pk),
+                        unlike_post(request, pk=post.pk)
+                    ),
+                    options["repeat"]
+                )
+                like_post(request, pk=post.pk)
+                repeated_like = timed(
+                    lambda: like_post(request, pk=post.pk),
+                    options["repeat"]
+                )
+                legacy = timed(
+                    lambda: visitor.id in [
+                        like.user_id for like in post.post_likes.all()
+                    ],
+                    min(options["repeat"], 5)
+                )
+                self.stdout.write(
+                    f"{size:>8} likes: like+unlike {summary(cycle)} | "
+                    f"already liked {summary(repeated_like)} | "
+                    f"old check {summary(legacy)}"
+                )
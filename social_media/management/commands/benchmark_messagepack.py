@@ -0,0 +1,105 @@
+import gzip
+import statistics
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from renderers import FastJSONRenderer, MessagePackRenderer
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    rolled_back,
+    timed,
+)
+from social_media.models import Commentary, Post, PostHashtags
+from user.models import UserProfile
+
+
+class Command(BaseCommand):
+    """Django command to compare JSON and MessagePack responses"""
+
+    help = (
+        "Request large pages of posts, users and the comment history as "
+        "JSON and as MessagePack and compare body sizes and encode times "
+        "(rolled back afterwards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        with rolled_back():
+            profiles = create_profiles(rows, "msgpack")
+            admin = UserProfile.objects.select_related("email").get(
+                pk=profiles[0]
+            ).email
+            admin.is_staff = True
+            admin.save()
+            token = Token.objects.create(user=admin)
+            posts = Post.objects.bulk_create(
+                Post(
+                    author_id=profiles[index % len(profiles)],
+                    title=f"Benchmark post {index}",
+                    content="Comparing response formats " * 10,
+                    comments_count=1,
+                    likes_count=index % 13
+                )
+                for index in range(rows)
+            )
+            tags = PostHashtags.objects.bulk_create(
+                PostHashtags(hashtag=f"msgpack{index}") for index in range(10)
+            )
+            Post.tags.through.objects.bulk_create(
+                Post.tags.through(post_id=post.id, posthashtags_id=tag.id)
+                for post in posts
+                for tag in tags[:post.id % 4]
+            )
+            Commentary.objects.bulk_create(
+                Commentary(
+                    user_id=profiles[index],
+                    post_id=post.id,
+                    content="Smaller is better"
+                )
+                for index, post in enumerate(posts)
+            )
+
+            client = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+            query = f"?page_size={rows}"
+            self.stdout.write(
+                f"{'':<18}{'json':>9}{'msgpack':>9}{'gzip json':>11}"
+                f"{'gzip msgpack':>14}{'encode json':>13}"
+                f"{'encode msgpack':>16}"
+            )
+            for name in ("posts", "users", "comments-history"):
+                path = reverse(
+                    "user:users-list" if name == "users"
+                    else f"social:{name}-list"
+                ) + query
+                json_body = client.get(
+                    path,
+                    HTTP_ACCEPT="application/json"
+                ).content
+                response = client.get(
+                    path,
+                    HTTP_ACCEPT="application/msgpack"
+                )
+                packed_body = response.content
+                encode = [
+                    statistics.median(
+                        timed(
+                            lambda: renderer.render(response.data),
+                            options["repeat"]
+                        )
+                    )
+                    for renderer in (FastJSONRenderer(), MessagePackRenderer())
+                ]
+                self.stdout.write(
+                    f"{name:<18}{len(json_body):>9}{len(packed_body):>9}"
+                    f"{len(gzip.compress(json_body)):>11}"
+                    f"{len(gzip.compress(packed_body)):>14}"
+                    f"{encode[0] * 1000:>10.2f} ms"
+                    f"{encode[1] * 1000:>13.2f} ms"
+                )
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+
+from pagination import PostPagination
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    rolled_back,
+    summary,
+    timed,
+)
+from social_media.models import Post
+
+
+class OffsetPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class Command(BaseCommand):
+    """Django command to compare page-number and keyset pagination"""
+
+    help = (
+        "Measure the cost of shallow and deep post pages with page-number "
+        "and cursor pagination on generated posts (rolled back afterwards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100000)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        factory = RequestFactory()
+        with rolled_back():
+            author = create_profiles(1, "pagination")[0]
+            Post.objects.bulk_create(
+                (
+                    Post(author_id=author, title="benchmark", content="page")
+                    for _ in range(options["posts"])
+                ),
+                batch_size=5000
+            )
+            queryset = Post.objects.all()
+            last_page = options["posts"] // page_size
+            pages = sorted({1, 10, 100, 1000, 10000, last_page})
+
+            for page in (page for page in pages if page <= last_page):
+                offset_request = Request(factory.get(
+                    "/", {"page": page, "page_size": page_size}
+                ))
+                offset = timed(
+                    lambda: OffsetPagination().paginate_queryset(
+                        queryset,
+                        offset_request
+                    ),
+                    options["repeat"]
+                )
+
+                params = {"page_size": page_size}
+                if page > 1:
+                    before = (
+                        queryset.order_by("-created_time", "-id")
+                        .values_list("created_time", "id")
+                        [(page - 1) * page_size - 1]
+                    )
+                    params["cursor"] = PostPagination().encode_cursor(
+                        list(before)
+                    )
+                cursor_request = Request(factory.get("/", params))
+                cursor = timed(
+                    lambda: PostPagination().paginate_queryset(
+                        queryset,
+                        cursor_request
+                    ),
+                    options["repeat"]
+                )
+                self.stdout.write(
+                    f"page {page:>6}: offset {summary(offset)} | "
+                    f"cursor {summary(cursor)}"
+                )
@@ -0,0 +1,120 @@
+import statistics
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+import renderers
+from renderers import FastJSONRenderer, StreamingJSONRenderer
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    rolled_back,
+    timed,
+)
+from social_media.models import Post, PostHashtags
+from social_media.serializers import PostListSerializer
+
+
+class Command(BaseCommand):
+    """Django command to compare the JSON renderers on post list pages"""
+
+    help = (
+        "Render pages of PostListSerializer output with DRF's JSONRenderer, "
+        "the orjson renderer and its json fallback, and measure the peak "
+        "memory of buffered and streamed pages (rolled back afterwards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        with rolled_back():
+            authors = create_profiles(20, "renderer")
+            posts = Post.objects.bulk_create(
+                Post(
+                    author_id=authors[index % len(authors)],
+                    title=f"Benchmark post {index}",
+                    content="Rendering a page of posts " * 20,
+                    comments_count=index % 7,
+                    likes_count=index % 13
+                )
+                for index in range(page_size)
+            )
+            tags = PostHashtags.objects.bulk_create(
+                PostHashtags(hashtag=f"renderer{index}")
+                for index in range(10)
+            )
+            Post.tags.through.objects.bulk_create(
+                Post.tags.through(post_id=post.id, posthashtags_id=tag.id)
+                for post in posts
+                for tag in tags[:post.id % 4]
+            )
+            queryset = (
+                Post.objects.select_related("author")
+                .prefetch_related("tags")
+                .filter(author_id__in=authors)
+                .order_by("-created_time", "-id")
+            )
+            page = list(queryset)
+            data = PostListSerializer(page, many=True).data
+
+            expected = JSONRenderer().render(data)
+            fast = FastJSONRenderer()
+            streaming = StreamingJSONRenderer()
+            self.stdout.write(
+                f"{len(page)} posts, {len(expected) / 1024:.0f} KiB of JSON, "
+                f"orjson {'installed' if renderers.orjson else 'missing'}, "
+                f"same bytes: {fast.render(data) == expected}"
+            )
+
+            orjson = renderers.orjson
+            cases = [
+                ("JSONRenderer", lambda: JSONRenderer().render(data)),
+                ("FastJSONRenderer", lambda: fast.render(data)),
+                ("stream format", lambda: streaming.render(data)),
+            ]
+            baseline = None
+            for name, render in cases:
+                render()
+                median = statistics.median(timed(render, options["repeat"]))
+                baseline = baseline or median
+                self.stdout.write(
+                    f"{name:<24}{median * 1000:8.2f} ms"
+                    f"{baseline / median:7.1f}x"
+                )
+            renderers.orjson = None
+            try:
+                fast.render(data)
+                median = statistics.median(
+                    timed(lambda: fast.render(data), options["repeat"])
+                )
+            finally:
+                renderers.orjson = orjson
+            self.stdout.write(
+                f"{'json fallback':<24}{median * 1000:8.2f} ms"
+                f"{baseline / median:7.1f}x"
+            )
+
+            def buffered(posts):
+                fast.render(PostListSerializer(posts, many=True).data)
+
+            def streamed(posts):
+                serializer = PostListSerializer()
+                results = map(serializer.to_representation, iter(posts))
+                for _ in streaming.stream({"results": results}):
+                    pass
+
+            for name, render in [
+                ("buffered", buffered),
+                ("streamed", streamed),
+            ]:
+                for size in (page_size // 10, page_size):
+                    tracemalloc.start()
+                    render(page[:size])
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    self.stdout.write(
+                        f"{name} page of {size:<6} peak {peak / 1024:8.0f} KiB"
+                    )
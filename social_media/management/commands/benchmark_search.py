@@ -0,0 +1,92 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from social_media import search
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    rolled_back,
+    summary,
+    timed,
+)
+from social_media.models import Post
+
+WORDS = (
+    "news election market football weather music travel science health "
+    "movie family school city energy water police history art food game "
+    "budget storm festival vaccine startup climate museum rocket harvest"
+).split()
+
+
+class Command(BaseCommand):
+    """Django command to compare icontains and full-text post search"""
+
+    help = (
+        "Time icontains scans and ranked full-text search over a generated "
+        "post corpus (rolled back afterwards). Full-text search needs "
+        "PostgreSQL, other databases only run the icontains fallback"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1000000)
+        parser.add_argument("--words", type=int, default=40)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--terms",
+            nargs="+",
+            default=["rocket", "climate museum", "zeppelin"],
+            help="Search terms, the last default one matches nothing"
+        )
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        if not search.is_supported():
+            self.stdout.write(
+                f"{connection.vendor} has no tsvector support, "
+                f"timing the icontains fallback only"
+            )
+        with rolled_back():
+            author = create_profiles(1, "search")[0]
+            Post.objects.bulk_create(
+                (
+                    Post(
+                        author_id=author,
+                        title=" ".join(random.choices(WORDS, k=4)),
+                        content=" ".join(
+                            random.choices(WORDS, k=options["words"])
+                        )
+                    )
+                    for _ in range(options["posts"])
+                ),
+                batch_size=5000
+            )
+            if search.is_supported():
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE social_media_post")
+
+            page = slice(0, options["page_size"])
+            for term in options["terms"]:
+                scan = timed(
+                    lambda: list(
+                        Post.objects.filter(
+                            Q(title__icontains=term)
+                            | Q(content__icontains=term)
+                        ).order_by("-created_time", "-id")[page]
+                    ),
+                    options["repeat"]
+                )
+                line = f"{term!r:>18}: icontains {summary(scan)}"
+                if search.is_supported():
+                    ranked = timed(
+                        lambda: list(
+                            search.search_posts(Post.objects.all(), term)
+                            .order_by("-rank", "-id")[page]
+                        ),
+                        options["repeat"]
+                    )
+                    line += f" | full-text {summary(ranked)}"
+                self.stdout.write(line)
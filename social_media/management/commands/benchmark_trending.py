@@ -0,0 +1,77 @@
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from social_media import trending
+from social_media.management.commands._benchmark import (
+    rolled_back,
+    summary,
+    timed,
+)
+from social_media.models import PostHashtags
+
+
+class Command(BaseCommand):
+    """Django command to measure trending hashtag ingest and reads"""
+
+    help = (
+        "Record generated hashtag uses spread over the trending window, "
+        "then time the ranking refresh and cached top-K reads "
+        "(rolled back afterwards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tags", type=int, default=10000)
+        parser.add_argument("--posts", type=int, default=20000)
+        parser.add_argument("--tags-per-post", type=int, default=3)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        now = timezone.now()
+        window = settings.TRENDING_WINDOW_SECONDS
+        with rolled_back():
+            tags = PostHashtags.objects.bulk_create(
+                [
+                    PostHashtags(hashtag=f"bench{index}")
+                    for index in range(options["tags"])
+                ],
+                batch_size=5000
+            )
+            # a few popular tags get most of the traffic
+            weights = [1 / (rank + 1) for rank in range(len(tags))]
+            uses = [
+                (
+                    {
+                        tag.id for tag in random.choices(
+                            tags,
+                            weights,
+                            k=options["tags_per_post"]
+                        )
+                    },
+                    now - timedelta(seconds=random.uniform(0, window))
+                )
+                for _ in range(options["posts"])
+            ]
+
+            start = time.perf_counter()
+            for tag_ids, moment in uses:
+                trending.record(list(tag_ids), moment)
+            ingest = time.perf_counter() - start
+            self.stdout.write(
+                f"ingest: {options['posts'] / ingest:10.0f} posts/s "
+                f"({options['posts']} posts, "
+                f"{options['tags_per_post']} tags each)"
+            )
+
+            refresh = timed(trending.refresh, options["repeat"])
+            cached = timed(trending.top, options["repeat"])
+            self.stdout.write(f"refresh: {summary(refresh)}")
+            self.stdout.write(f" cached: {summary(cached)}")
+            cache.delete(trending.CACHE_KEY)
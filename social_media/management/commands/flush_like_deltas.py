@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from social_media import counters
+
+
+class Command(BaseCommand):
+    """Django command to fold buffered like deltas into post counters"""
+
+    help = (
+        "Apply pending PostLikeDelta rows to Post.likes_count, once or "
+        "every --interval seconds"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep flushing with this pause in seconds between passes"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = 0
+            while folded := counters.flush_like_deltas(options["batch_size"]):
+                flushed += folded
+            self.stdout.write(f"Flushed {flushed} like deltas")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from social_media import timeline
+from user.models import UserProfile
+
+
+class Command(BaseCommand):
+    """Django command to rebuild materialized home timelines"""
+
+    help = "Rebuild home timelines from the current follow graph"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "profiles",
+            nargs="*",
+            type=int,
+            help="Profile ids to rebuild (all profiles by default)"
+        )
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.order_by("id").values_list(
+            "id",
+            flat=True
+        )
+        if options["profiles"]:
+            profiles = profiles.filter(id__in=options["profiles"])
+
+        rebuilt = 0
+        for profile_id in profiles.iterator():
+            timeline.rebuild(profile_id)
+            rebuilt += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rebuilt} timelines")
+        )
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from social_media import counters, post_cache
+from social_media.models import Post, pending_likes
+
+
+class Command(BaseCommand):
+    """Django command to repair drifted post like and comment counters"""
+
+    help = (
+        "Recompute Post.likes_count and Post.comments_count in batches, "
+        "leaving unflushed like deltas pending"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted posts"
+        )
+
+    def handle(self, *args, **options):
+        last_id, checked, repaired = 0, 0, 0
+        while True:
+            ids = list(
+                Post.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            checked += len(ids)
+
+            drifted = (
+                Post.objects.filter(id__in=ids)
+                .annotate(
+                    actual_likes=counters.actual_likes(),
+                    actual_comments=counters.actual_comments(),
+                    unflushed_likes=pending_likes()
+                )
+                .filter(
+                    ~Q(likes_count=F("actual_likes") - F("unflushed_likes"))
+                    | ~Q(comments_count=F("actual_comments"))
+                )
+                .values_list("id", flat=True)
+            )
+            drifted = list(drifted)
+            if drifted and not options["dry_run"]:
+                Post.objects.filter(id__in=drifted).update(
+                    likes_count=counters.actual_likes() - pending_likes(),
+                    comments_count=counters.actual_comments()
+                )
+                post_cache.invalidate(*drifted)
+            repaired += len(drifted)
+
+        action = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} posts. {action} {repaired} drifted counters"
+        ))
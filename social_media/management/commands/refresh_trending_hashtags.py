@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from social_media import trending
+
+
+class Command(BaseCommand):
+    """Django command to slide the trending hashtags window"""
+
+    help = (
+        "Delete hashtag buckets older than TRENDING_WINDOW_SECONDS and "
+        "recompute the cached top hashtags, once or every --interval seconds"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep refreshing with this pause in seconds between passes"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            pruned = trending.prune()
+            ranking = trending.refresh()
+            self.stdout.write(
+                f"Pruned {pruned} buckets, {len(ranking)} trending hashtags"
+            )
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from social_media import timeline
+
+
+class Command(BaseCommand):
+    """Django command to switch authors between pushed and pulled feeds"""
+
+    help = (
+        "Flag authors at FEED_CELEBRITY_THRESHOLD followers as pulled and "
+        "push authors below FEED_CELEBRITY_RELEASE_THRESHOLD again, once or "
+        "every --interval seconds"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep switching with this pause in seconds between passes"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            pulled = timeline.pull_celebrities()
+            pushed = timeline.push_released()
+            self.stdout.write(
+                f"Pulled {pulled} authors, pushed {pushed} authors"
+            )
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from social_media import timeline
+
+
+class Command(BaseCommand):
+    """Django command to cut home timelines down to TIMELINE_DEPTH"""
+
+    help = (
+        "Delete the entries of home timelines beyond TIMELINE_DEPTH, once "
+        "or every --interval seconds"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep trimming with this pause in seconds between passes"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            trimmed = timeline.trim()
+            self.stdout.write(f"Trimmed {trimmed} timelines")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
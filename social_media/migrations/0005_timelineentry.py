@@ -0,0 +1,60 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0004_like_like_post_like"),
+        ("user", "0012_alter_userfollowing_you_follow_to_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimelineEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_time", models.DateTimeField()),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="timeline",
+                        to="user.userprofile",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="timeline_entries",
+                        to="social_media.post",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-created_time", "-post_id"),
+                "indexes": [
+                    models.Index(
+                        fields=["owner", "-created_time", "-post"],
+                        name="timeline_owner_created_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="timelineentry",
+            constraint=models.UniqueConstraint(
+                fields=("owner", "post"), name="timeline_entry"
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0005_timelineentry"),
+        ("user", "0014_userfollowing_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="commentary",
+            index=models.Index(
+                fields=["-created_time", "-id"], name="commentary_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="commentary",
+            index=models.Index(
+                fields=["user", "-created_time", "-id"],
+                name="commentary_user_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["-created_time", "-id"], name="like_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["-created_time", "-id"], name="post_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "-created_time", "-id"],
+                name="post_author_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_rows(model):
+    rows = (
+        model.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model("social_media", "Post")
+    Like = apps.get_model("social_media", "Like")
+    Commentary = apps.get_model("social_media", "Commentary")
+    Post.objects.update(
+        likes_count=count_rows(Like),
+        comments_count=count_rows(Commentary),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0006_post_commentary_like_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0007_post_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostLikeDelta",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("delta", models.SmallIntegerField()),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="like_deltas",
+                        to="social_media.post",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:49
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_SEARCH = [
+    "CREATE INDEX post_search_idx ON social_media_post "
+    "USING gin (search_vector)",
+    "CREATE TRIGGER post_search_vector_update "
+    "BEFORE INSERT OR UPDATE OF title, content ON social_media_post "
+    "FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger("
+    "search_vector, 'pg_catalog.english', title, content)",
+    "UPDATE social_media_post SET search_vector = to_tsvector("
+    "'pg_catalog.english', "
+    "coalesce(title, '') || ' ' || coalesce(content, ''))",
+]
+
+DROP_SEARCH = [
+    "DROP TRIGGER IF EXISTS post_search_vector_update ON social_media_post",
+    "DROP INDEX IF EXISTS post_search_idx",
+]
+
+
+def run_on_postgres(statements):
+    """The tsvector trigger and GIN index only exist on PostgreSQL"""
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            for sql in statements:
+                schema_editor.execute(sql, params=None)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0008_postlikedelta"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            run_on_postgres(CREATE_SEARCH),
+            run_on_postgres(DROP_SEARCH),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:51
+
+import re
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+HASHTAG_PATTERN = re.compile(r"#?(\w+)")
+
+
+def parse_hashtags(text):
+    tags = []
+    for tag in HASHTAG_PATTERN.findall(text or ""):
+        tag = tag.lower()[:20]
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def merge_hashtags(apps, schema_editor):
+    """Normalize existing tags and drop duplicates before the unique index"""
+    PostHashtags = apps.get_model("social_media", "PostHashtags")
+    seen = set()
+    for tag in PostHashtags.objects.order_by("id"):
+        names = parse_hashtags(tag.hashtag)
+        if not names or names[0] in seen:
+            tag.delete()
+            continue
+        seen.add(names[0])
+        if tag.hashtag != names[0]:
+            tag.hashtag = names[0]
+            tag.save(update_fields=["hashtag"])
+
+
+def fill_tags(apps, schema_editor):
+    Post = apps.get_model("social_media", "Post")
+    PostHashtags = apps.get_model("social_media", "PostHashtags")
+    PostTags = Post.tags.through
+
+    posts = (
+        Post.objects.exclude(hashtags__isnull=True)
+        .exclude(hashtags="")
+        .order_by("id")
+        .values_list("id", "hashtags")
+    )
+    last_id = 0
+    while True:
+        batch = list(posts.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1][0]
+
+        names = {
+            post_id: parse_hashtags(hashtags) for post_id, hashtags in batch
+        }
+        PostHashtags.objects.bulk_create(
+            [
+                PostHashtags(hashtag=name)
+                for name in set().union(*names.values())
+            ],
+            ignore_conflicts=True
+        )
+        tag_ids = dict(
+            PostHashtags.objects.filter(
+                hashtag__in=set().union(*names.values())
+            ).values_list("hashtag", "id")
+        )
+        PostTags.objects.bulk_create(
+            [
+                PostTags(post_id=post_id, posthashtags_id=tag_ids[name])
+                for post_id, post_names in names.items()
+                for name in post_names
+            ],
+            ignore_conflicts=True
+        )
+
+
+def fill_hashtags(apps, schema_editor):
+    Post = apps.get_model("social_media", "Post")
+    for post in Post.objects.prefetch_related("tags"):
+        post.hashtags = ", ".join(
+            f"#{tag.hashtag}" for tag in post.tags.all()
+        )
+        post.save(update_fields=["hashtags"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0009_post_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_hashtags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="posthashtags",
+            name="hashtag",
+            field=models.CharField(max_length=20, unique=True),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="tags",
+            field=models.ManyToManyField(
+                blank=True, related_name="posts", to="social_media.posthashtags"
+            ),
+        ),
+        migrations.RunPython(fill_tags, fill_hashtags),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0010_post_tags"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="post",
+            name="hashtags",
+        ),
+    ]
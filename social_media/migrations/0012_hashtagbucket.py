@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0011_remove_post_hashtags"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HashtagBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start", models.DateTimeField()),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="buckets",
+                        to="social_media.posthashtags",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["start"], name="hashtag_bucket_start_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="hashtagbucket",
+            constraint=models.UniqueConstraint(
+                fields=("tag", "start"), name="hashtag_bucket"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0012_hashtagbucket"),
+        ("user", "0017_userprofile_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["user", "-created_time", "-id"], name="like_user_created_idx"
+            ),
+        ),
+    ]
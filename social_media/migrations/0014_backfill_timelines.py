@@ -0,0 +1,54 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:05
+
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_timelines(apps, schema_editor):
+    """Fill the timelines of existing profiles, like rebuild_timelines"""
+    if settings.FEED_MODE == "pull":
+        return
+    Post = apps.get_model("social_media", "Post")
+    TimelineEntry = apps.get_model("social_media", "TimelineEntry")
+    UserProfile = apps.get_model("user", "UserProfile")
+    UserFollowing = apps.get_model("user", "UserFollowing")
+
+    authors = UserProfile.objects.all()
+    if settings.FEED_MODE == "hybrid":
+        authors = authors.filter(
+            followers_count__lt=settings.FEED_CELEBRITY_THRESHOLD
+        )
+    owner_ids = (
+        UserFollowing.objects.order_by("your_followers_id")
+        .values_list("your_followers_id", flat=True)
+        .distinct()
+    )
+    for owner_id in list(owner_ids):
+        posts = Post.objects.filter(
+            author__in=authors.filter(
+                following__your_followers_id=owner_id
+            )
+        ).order_by("-created_time", "-id").values_list("id", "created_time")
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    owner_id=owner_id,
+                    post_id=post_id,
+                    created_time=created_time
+                )
+                for post_id, created_time in posts[:settings.TIMELINE_DEPTH]
+            ],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0013_like_like_user_created_idx"),
+        ("user", "0017_userprofile_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
 import os
 import uuid
 
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 import user.models
 
@@ -14,12 +18,32 @@ def post_image_file_path(instance, filename):
 
 
 class PostHashtags(models.Model):
-    hashtag = models.CharField(max_length=20, null=False)
+    hashtag = models.CharField(max_length=20, null=False, unique=True)
 
     def __str__(self):
         return f"#{self.hashtag}"
 
 
+def pending_likes():
+    """Sum of the unflushed like deltas of the outer post"""
+    deltas = (
+        PostLikeDelta.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(total=Sum("delta"))
+        .values("total")
+    )
+    return Coalesce(Subquery(deltas), 0)
+
+
+class PostManager(models.Manager):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if settings.LIKE_COUNTER_MODE == "buffered":
+            queryset = queryset.annotate(pending_likes=pending_likes())
+        return queryset
+
+
 class Post(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
@@ -29,7 +53,14 @@ class Post(models.Model):
         null=True,
         upload_to=post_image_file_path
     )
-    hashtags = models.CharField(max_length=100, blank=True, null=True)
+    tags = models.ManyToManyField(
+        PostHashtags,
+        related_name="posts",
+        blank=True
+    )
+    comments_count = models.PositiveIntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     author = models.ForeignKey(
         user.models.UserProfile,
@@ -37,14 +68,31 @@ class Post(models.Model):
         related_name="posts"
     )
 
-    def comments_count(self):
-        return self.posts.count()
-
-    def likes_count(self):
-        return self.post_likes.count()
+    objects = PostManager()
 
     class Meta:
         ordering = ("-created_time", )
+        indexes = [
+            models.Index(
+                fields=["-created_time", "-id"],
+                name="post_created_idx"
+            ),
+            models.Index(
+                fields=["author", "-created_time", "-id"],
+                name="post_author_created_idx"
+            ),
+        ]
+
+    @property
+    def total_likes(self):
+        return self.likes_count + getattr(self, "pending_likes", 0)
+
+    @property
+    def comment_list(self):
+        """Comments prefetched into loaded_comments, else all comments"""
+        if hasattr(self, "loaded_comments"):
+            return self.loaded_comments
+        return self.posts.all()
 
     def __str__(self) -> str:
         return (f"owner:{self.author},"
@@ -67,6 +115,16 @@ class Commentary(models.Model):
 
     class Meta:
         ordering = ("-created_time", )
+        indexes = [
+            models.Index(
+                fields=["-created_time", "-id"],
+                name="commentary_created_idx"
+            ),
+            models.Index(
+                fields=["user", "-created_time", "-id"],
+                name="commentary_user_created_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"user:{self.user}, created: {self.created_time}"
@@ -89,6 +147,84 @@ class Like(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["post", "user"],  name="post_like")
         ]
+        indexes = [
+            models.Index(
+                fields=["-created_time", "-id"],
+                name="like_created_idx"
+            ),
+            models.Index(
+                fields=["user", "-created_time", "-id"],
+                name="like_user_created_idx"
+            )
+        ]
 
     def __str__(self) -> str:
         return f"user:{self.user}, liked: {self.created_time}"
+
+
+class PostLikeDelta(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="like_deltas"
+    )
+    delta = models.SmallIntegerField()
+
+    def __str__(self) -> str:
+        return f"post: {self.post_id}, delta: {self.delta}"
+
+
+class TimelineEntry(models.Model):
+    owner = models.ForeignKey(
+        user.models.UserProfile,
+        on_delete=models.CASCADE,
+        related_name="timeline"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries"
+    )
+    created_time = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-created_time", "-post_id")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "post"],
+                name="timeline_entry"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["owner", "-created_time", "-post"],
+                name="timeline_owner_created_idx"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"owner:{self.owner_id}, post: {self.post_id}"
+
+
+class HashtagBucket(models.Model):
+    tag = models.ForeignKey(
+        PostHashtags,
+        on_delete=models.CASCADE,
+        related_name="buckets"
+    )
+    start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tag", "start"],
+                name="hashtag_bucket"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["start"], name="hashtag_bucket_start_idx")
+        ]
+
+    def __str__(self) -> str:
+        return f"tag: {self.tag_id}, start: {self.start}, count: {self.count}"
@@ -0,0 +1,212 @@
+"""Cache of rendered post representations.
+
+Serializing a post resolves its author, tags and every comment with the
+name of its author. Rendered posts are kept in the default cache keyed by
+serializer, post id and a per-post version number. Saving or deleting a
+post, one of its comments or likes, changing its tags or renaming a
+profile gives the affected posts a new version after commit, so stale
+renderings are never read again and expire after POST_CACHE_TTL seconds.
+Versions expire after POST_CACHE_VERSION_TTL seconds or earlier when the
+cache evicts them. A missing version starts over with a new, higher one,
+which costs a miss but never serves an older rendering. The cache must be
+shared by all processes (see REDIS_URL), or a process keeps serving the
+renderings of versions that another process already replaced.
+
+List pages read the versions and the renderings of all their posts with
+two multi-gets and only serialize the misses. Photos are cached as paths
+and made absolute per request, like ImageField does. Lookups of this
+process are counted in ``stats``.
+
+Misses are coalesced with ``single_flight.fill`` so that a hot post is
+rendered once however many requests miss it together, other requests
+wait for at most POST_CACHE_LOCK_TIMEOUT seconds. A rendering older than
+POST_CACHE_TTL stays in the cache for POST_CACHE_STALE_SECONDS more:
+while one request renders it again everybody else is served the stale
+copy instead of waiting (stale-while-revalidate).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from social_media import single_flight
+
+
+def version_key(post_id: int) -> str:
+    return f"post-version:{post_id}"
+
+
+def entry_key(kind: str, post_id: int, version: int) -> str:
+    return f"post:{kind}:{post_id}:{version}"
+
+
+def new_version() -> int:
+    return time.time_ns()
+
+
+def invalidate(*post_ids: int) -> None:
+    """Give posts a new version, call after their changes committed"""
+    if post_ids:
+        version = new_version()
+        cache.set_many(
+            {version_key(post_id): version for post_id in post_ids},
+            settings.POST_CACHE_VERSION_TTL
+        )
+
+
+def versions(post_ids: list[int]) -> dict[int, int]:
+    keys = {version_key(post_id): post_id for post_id in post_ids}
+    found = cache.get_many(keys)
+    result = {keys[key]: version for key, version in found.items()}
+    for key, post_id in keys.items():
+        if key not in found:
+            # an evicted version starts over with a new one, never at 0
+            version = new_version()
+            if not cache.add(key, version, settings.POST_CACHE_VERSION_TTL):
+                version = cache.get(key, version)
+            result[post_id] = version
+    return result
+
+
+class CacheStats:
+    """Outcomes and timings of post cache lookups in this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.lookups = 0
+        self.hits = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.lookup_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def record(
+        self,
+        hits: int,
+        stale: int,
+        coalesced: int,
+        misses: int,
+        lookup_seconds: float,
+        render_seconds: float
+    ) -> None:
+        with self.lock:
+            self.lookups += 1
+            self.hits += hits
+            self.stale += stale
+            self.coalesced += coalesced
+            self.misses += misses
+            self.lookup_seconds += lookup_seconds
+            self.render_seconds += render_seconds
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            served = self.hits + self.stale + self.coalesced + self.misses
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "stale": self.stale,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "hit_ratio": (
+                    (served - self.misses) / served if served else 0.0
+                ),
+                "avg_lookup_ms": (
+                    self.lookup_seconds * 1000 / self.lookups
+                    if self.lookups else 0.0
+                ),
+                "avg_render_ms": (
+                    self.render_seconds * 1000 / self.misses
+                    if self.misses else 0.0
+                ),
+            }
+
+
+stats = CacheStats()
+
+
+def with_request(data: dict, request) -> dict:
+    if request is not None and data.get("photo"):
+        data["photo"] = request.build_absolute_uri(data["photo"])
+    return data
+
+
+def render(post_ids, kind, serialize, load, request=None) -> list[dict]:
+    """Representations of posts in the given order.
+
+    kind names the representation, load(ids) returns the posts missing
+    from the cache with everything serialize(posts) reads prefetched.
+    Posts that no longer exist are left out of the result.
+    """
+    post_ids = list(post_ids)
+    if not post_ids:
+        return []
+    start = time.perf_counter()
+    post_versions = versions(post_ids)
+    keys = {
+        post_id: entry_key(kind, post_id, post_versions[post_id])
+        for post_id in post_ids
+    }
+    entries = cache.get_many(keys.values())
+    looked_up = time.perf_counter()
+
+    now = time.time()
+    found, stale = {}, {}
+    for post_id, key in keys.items():
+        if key in entries:
+            fresh_until, data = entries[key]
+            if fresh_until > now:
+                found[post_id] = data
+            else:
+                stale[post_id] = data
+
+    render_seconds = 0.0
+
+    def build(ids):
+        nonlocal render_seconds
+        building = time.perf_counter()
+        rendered = {
+            data["id"]: data
+            for data in serialize(load(ids))
+        }
+        fresh_until = time.time() + settings.POST_CACHE_TTL
+        cache.set_many(
+            {
+                keys[post_id]: (fresh_until, data)
+                for post_id, data in rendered.items()
+            },
+            settings.POST_CACHE_TTL + settings.POST_CACHE_STALE_SECONDS
+        )
+        render_seconds += time.perf_counter() - building
+        return rendered
+
+    filled, counts = {}, {"built": 0, "waited": 0, "stale": 0}
+    missed = {
+        post_id: key for post_id, key in keys.items() if post_id not in found
+    }
+    if missed:
+        filled, counts = single_flight.fill(
+            missed,
+            stale,
+            build,
+            settings.POST_CACHE_LOCK_TIMEOUT
+        )
+    stats.record(
+        len(found),
+        counts["stale"],
+        counts["waited"],
+        counts["built"],
+        looked_up - start,
+        render_seconds
+    )
+
+    representations = []
+    for post_id in post_ids:
+        data = found.get(post_id) or filled.get(post_id)
+        if data is not None:
+            representations.append(with_request(data, request))
+    return representations
@@ -0,0 +1,113 @@
+"""Sparse post representations.
+
+``?fields=`` keeps only the listed fields of a post, ``?expand=comments``
+embeds comments where the endpoint leaves them out and
+``?comments_limit=N`` embeds only the latest N comments of every post.
+Posts are loaded with just the columns and relations the kept fields
+read, and limited comments come from one sliced prefetch query that
+Django runs with a ROW_NUMBER() window per post.
+"""
+from django.db.models import Prefetch
+
+from social_media.models import Commentary, Post
+from social_media.serializers import PostSerializer
+
+# model columns read by every post field, "id" is always loaded
+POST_COLUMNS = {
+    "id": (),
+    "photo": ("photo",),
+    "title": ("title",),
+    "content": ("content",),
+    "created_time": ("created_time",),
+    "author": ("author", "author__first_name", "author__last_name"),
+    "hashtags": (),
+    "comments_count": ("comments_count",),
+    "likes_count": ("likes_count",),
+    "comments": (),
+}
+
+COMMENT_COLUMNS = (
+    "id",
+    "post",
+    "content",
+    "created_time",
+    "user",
+    "user__first_name",
+    "user__last_name",
+)
+
+
+class PostRepresentation:
+    def __init__(self, serializer_class, fields=None, comments_limit=None):
+        self.serializer_class = serializer_class
+        # posts are cached and ordered by id, so it is always kept
+        self.fields = [
+            name for name in serializer_class.Meta.fields
+            if fields is None or name in fields or name == "id"
+        ]
+        self.comments_limit = comments_limit
+        self.sparse = fields is not None or comments_limit is not None
+
+    @classmethod
+    def from_request(cls, request, serializer_class):
+        """Representation asked for by the query parameters, if any"""
+        if request is None:
+            return cls(serializer_class)
+        params = request.query_params
+        if "comments" in params.get("expand", "").split(","):
+            serializer_class = PostSerializer
+        fields = None
+        if params.get("fields"):
+            fields = set(params["fields"].split(","))
+        try:
+            comments_limit = max(int(params["comments_limit"]), 0)
+        except (KeyError, ValueError):
+            comments_limit = None
+        return cls(serializer_class, fields, comments_limit)
+
+    @property
+    def kind(self) -> str:
+        """Post cache kind, full representations keep the serializer name"""
+        if not self.sparse:
+            return self.serializer_class.__name__
+        return (
+            f"{self.serializer_class.__name__}:{','.join(self.fields)}"
+            f":{self.comments_limit}"
+        )
+
+    def comments(self):
+        comments = (
+            Commentary.objects.select_related("user")
+            .only(*COMMENT_COLUMNS)
+            .order_by("-created_time", "-id")
+        )
+        if self.comments_limit is not None:
+            comments = comments[:self.comments_limit]
+        return comments
+
+    def load(self, ids) -> list[Post]:
+        columns = ["id"]
+        for name in self.fields:
+            columns += POST_COLUMNS[name]
+        queryset = Post.objects.filter(id__in=ids).only(*columns).order_by()
+        if "author" in self.fields:
+            queryset = queryset.select_related("author")
+        if "hashtags" in self.fields:
+            queryset = queryset.prefetch_related("tags")
+        if "comments" in self.fields:
+            if self.comments_limit == 0:
+                comments = Commentary.objects.none()
+            else:
+                comments = self.comments()
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "posts",
+                    queryset=comments,
+                    to_attr="loaded_comments"
+                )
+            )
+        return list(queryset)
+
+    def serialize(self, posts) -> list[dict]:
+        kwargs = {"fields": self.fields} if self.sparse else {}
+        return self.serializer_class(posts, many=True, **kwargs).data
@@ -0,0 +1,31 @@
+"""Full-text search over post title and content.
+
+On PostgreSQL posts are matched against the stored ``Post.search_vector``
+column (GIN indexed, filled by a trigger on insert and update) and ranked
+with ``ts_rank``. Other databases fall back to ``icontains`` on title and
+content with a constant rank, so ``?q=`` keeps working in tests.
+"""
+from django.db import connection
+from django.db.models import F, Q, QuerySet
+from django.contrib.postgres.search import SearchQuery, SearchRank
+
+from pagination import cursor_rank
+
+SEARCH_CONFIG = "english"
+
+
+def is_supported() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def search_posts(queryset: QuerySet, text: str) -> QuerySet:
+    """Filter posts matching text and annotate them with a float rank"""
+    if not is_supported():
+        return queryset.filter(
+            Q(title__icontains=text) | Q(content__icontains=text)
+        ).annotate(rank=cursor_rank())
+
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    return queryset.filter(search_vector=query).annotate(
+        rank=cursor_rank(SearchRank(F("search_vector"), query))
+    )
@@ -1,8 +1,55 @@
+from django.db.models import CharField, Value
+from django.db.models.functions import Concat
 from rest_framework import serializers
 
+from projection import ValuesSerializer
+from update_fields import UpdateFieldsMixin
+from social_media import trending
+from social_media.hashtags import HASHTAG_MAX_LENGTH, get_tags, parse_hashtags
 from social_media.models import Post, Commentary, Like
 
 
+class HashtagsField(serializers.Field):
+    """Hashtags typed as "#tag1, #tag2", stored as PostHashtags rows"""
+
+    default_error_messages = {
+        "invalid": "Not a valid string.",
+        "max_length": (
+            "Hashtag #{tag} is longer than {max_length} characters."
+        ),
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault(
+            "style",
+            {"placeholder": "type example: #tag1, #tag2"}
+        )
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail("invalid")
+        tags = parse_hashtags(data)
+        for tag in tags:
+            if len(tag) > HASHTAG_MAX_LENGTH:
+                self.fail("max_length", tag=tag, max_length=HASHTAG_MAX_LENGTH)
+        return tags
+
+    def to_representation(self, value):
+        return ", ".join(f"#{tag.hashtag}" for tag in value.all())
+
+
+class DynamicFieldsMixin:
+    """Serializer that keeps only the fields passed as fields=[...]"""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class CommentarySerializer(serializers.ModelSerializer):
     class Meta:
         model = Commentary
@@ -62,26 +109,74 @@ class CommentaryPostSerializer(CommentarySerializer):
         fields = ("id", "author", "content", "created_time")
 
 
+class CommentaryHistorySerializer(ValuesSerializer):
+    """CommentaryListSerializer rows for the admin history list"""
+
+    id = serializers.IntegerField(read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
+    full_name = serializers.CharField(read_only=True)
+    content = serializers.CharField(read_only=True)
+    post_id = serializers.IntegerField(read_only=True)
+    post_title = serializers.CharField(read_only=True)
+    created_time = serializers.DateTimeField(read_only=True)
+
+    columns = {
+        "id": "id",
+        "user_id": "user_id",
+        "full_name": Concat(
+            "user__first_name",
+            Value(" "),
+            "user__last_name",
+            output_field=CharField()
+        ),
+        "content": "content",
+        "post_id": "post_id",
+        "post_title": "post__title",
+        "created_time": "created_time",
+    }
+
+
 class LikeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Like
         fields = ("id", "user", "created_time", "post")
 
 
-class PostSerializer(serializers.ModelSerializer):
+class LikeHistorySerializer(ValuesSerializer):
+    """LikeSerializer rows for the admin history list"""
+
+    id = serializers.IntegerField(read_only=True)
+    user = serializers.IntegerField(read_only=True)
+    created_time = serializers.DateTimeField(read_only=True)
+    post = serializers.IntegerField(read_only=True)
+
+    columns = {
+        "id": "id",
+        "user": "user_id",
+        "created_time": "created_time",
+        "post": "post_id",
+    }
+
+
+class PostSerializer(
+    DynamicFieldsMixin,
+    UpdateFieldsMixin,
+    serializers.ModelSerializer
+):
     author = serializers.SlugRelatedField(
         slug_field="full_name",
         read_only=True
     )
-    hashtags = serializers.CharField(
-        allow_blank=True,
-        style={'placeholder': 'type example: #tag1, #tag2'}
-    )
+    hashtags = HashtagsField(source="tags")
     comments = CommentaryPostSerializer(
-        source="posts",
+        source="comment_list",
         many=True,
         read_only=True
     )
+    likes_count = serializers.IntegerField(
+        source="total_likes",
+        read_only=True
+    )
 
     class Meta:
         model = Post
@@ -97,12 +192,21 @@ class PostSerializer(serializers.ModelSerializer):
             "likes_count",
             "comments"
         )
-        read_only_fields = ("author", )
+        read_only_fields = ("author", "comments_count", "likes_count")
 
     def create(self, validated_data):
-
+        tags = get_tags(validated_data.pop("tags", []))
         author = self.context["request"].user.profile
         post = Post.objects.create(author=author, **validated_data)
+        post.tags.set(tags)
+        trending.record([tag.id for tag in tags])
+        return post
+
+    def update(self, instance, validated_data):
+        tags = validated_data.pop("tags", None)
+        post = super().update(instance, validated_data)
+        if tags is not None:
+            post.tags.set(get_tags(tags))
         return post
 
 
@@ -111,9 +215,10 @@ class PostListSerializer(PostSerializer):
         slug_field="full_name",
         read_only=True
     )
-    hashtags = serializers.CharField(
-        allow_blank=True,
-        style={'placeholder': 'type example: #tag1, #tag2'}
+    hashtags = HashtagsField(source="tags")
+    likes_count = serializers.IntegerField(
+        source="total_likes",
+        read_only=True
     )
 
     class Meta:
@@ -129,7 +234,31 @@ class PostListSerializer(PostSerializer):
             "comments_count",
             "likes_count"
         )
-        read_only_fields = ("author", )
+        read_only_fields = ("author", "comments_count", "likes_count")
+
+
+class TrendingHashtagSerializer(serializers.Serializer):
+    hashtag = serializers.CharField(read_only=True)
+    count = serializers.IntegerField(read_only=True)
+
+
+class PostCacheStatsSerializer(serializers.Serializer):
+    lookups = serializers.IntegerField(read_only=True)
+    hits = serializers.IntegerField(read_only=True)
+    stale = serializers.IntegerField(read_only=True)
+    coalesced = serializers.IntegerField(read_only=True)
+    misses = serializers.IntegerField(read_only=True)
+    hit_ratio = serializers.FloatField(read_only=True)
+    avg_lookup_ms = serializers.FloatField(read_only=True)
+    avg_render_ms = serializers.FloatField(read_only=True)
+
+
+class PostBatchSerializer(serializers.Serializer):
+    results = PostSerializer(many=True, read_only=True)
+    missing = serializers.ListField(
+        child=serializers.IntegerField(),
+        read_only=True
+    )
 
 
 class PostImageSerializer(serializers.ModelSerializer):
@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from social_media import post_cache, timeline
+from social_media.models import Commentary, Like, Post
+from user.models import UserProfile
+
+
+@receiver(post_save, sender=Post)
+def fan_out_created_post(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: timeline.fan_out_post(instance))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def forget_rendered_post(sender, instance, **kwargs):
+    post_id = instance.id
+    transaction.on_commit(lambda: post_cache.invalidate(post_id))
+
+
+@receiver(post_save, sender=Commentary)
+@receiver(post_delete, sender=Commentary)
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def forget_rendered_post_of(sender, instance, **kwargs):
+    """Comments and like counts are part of the rendered post"""
+    post_id = instance.post_id
+    transaction.on_commit(lambda: post_cache.invalidate(post_id))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def forget_retagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        post_ids = [instance.id]
+    elif pk_set:
+        post_ids = list(pk_set)
+    else:
+        post_ids = list(instance.posts.values_list("id", flat=True))
+    transaction.on_commit(lambda: post_cache.invalidate(*post_ids))
+
+
+@receiver(post_save, sender=UserProfile)
+def forget_posts_of_profile(sender, instance, raw, update_fields, **kwargs):
+    """Rendered posts show the names of their author and commenters"""
+    if raw or (
+        update_fields is not None
+        and not {"first_name", "last_name"} & set(update_fields)
+    ):
+        return
+    post_ids = list(
+        Post.objects.filter(
+            Q(author_id=instance.id)
+            | Q(id__in=Commentary.objects.filter(
+                user_id=instance.id
+            ).values("post_id"))
+        ).values_list("id", flat=True)
+    )
+    if post_ids:
+        transaction.on_commit(lambda: post_cache.invalidate(*post_ids))
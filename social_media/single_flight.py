@@ -0,0 +1,162 @@
+"""Single-flight fills of cache entries that expire softly.
+
+Entries are ``(fresh_until, value)`` tuples, fresh_until in epoch
+seconds, stored for longer than they are fresh so an expired value can
+still be served while it is built again. ``fill`` builds missing or
+expired keys once however many requests miss them together. Within a
+process the first thread to miss a key builds it and the other threads
+wait for it. Across processes the builder also holds a lock key in the
+cache and other processes poll for the value, for at most lock_timeout
+seconds. Callers that hold an expired value are served that instead of
+waiting (stale-while-revalidate).
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+
+WAIT_INTERVAL = 0.01
+
+
+def lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+class Flights:
+    """Cache keys being built by a thread of this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events: dict[str, threading.Event] = {}
+
+    def join(self, key: str) -> tuple[bool, threading.Event]:
+        """Whether the caller builds key, and the event set when done"""
+        with self.lock:
+            event = self.events.get(key)
+            if event is not None:
+                return False, event
+            event = self.events[key] = threading.Event()
+            return True, event
+
+    def land(self, key: str) -> None:
+        with self.lock:
+            event = self.events.pop(key)
+        event.set()
+
+
+flights = Flights()
+
+
+def read(keys: dict, fresh: bool = False) -> dict:
+    """Cached values of the ids in keys, only fresh ones if fresh"""
+    if not keys:
+        return {}
+    entries = cache.get_many(keys.values())
+    now = time.time()
+    return {
+        item_id: entries[key][1]
+        for item_id, key in keys.items()
+        if key in entries and (not fresh or entries[key][0] > now)
+    }
+
+
+def wait_for(keys: dict, deadline: float) -> dict:
+    """Poll for values other processes hold the lock of"""
+    found = {}
+    while keys:
+        found.update(read({
+            item_id: key
+            for item_id, key in keys.items()
+            if item_id not in found
+        }))
+        pending = [
+            lock_key(key)
+            for item_id, key in keys.items()
+            if item_id not in found
+        ]
+        if (
+            not pending
+            or not cache.get_many(pending)
+            or time.monotonic() >= deadline
+        ):
+            break
+        time.sleep(WAIT_INTERVAL)
+    return found
+
+
+def fill(
+    keys: dict,
+    stale: dict,
+    build,
+    lock_timeout: float
+) -> tuple[dict, dict]:
+    """Build the ids in keys, every key once per process and cache.
+
+    keys maps ids that are missing or stale to their cache key, stale
+    holds the expired values at hand and build(ids) builds and stores
+    the values of ids. Returns the values by id and how many were built
+    here, waited for and served stale.
+    """
+    deadline = time.monotonic() + lock_timeout
+    leaders, followers = [], {}
+    for item_id, key in keys.items():
+        leader, event = flights.join(key)
+        if leader:
+            leaders.append(item_id)
+        elif item_id not in stale:
+            followers[item_id] = event
+
+    values, owned, building, waited = {}, [], [], {}
+    try:
+        owned = [
+            item_id for item_id in leaders
+            if cache.add(lock_key(keys[item_id]), True, lock_timeout)
+        ]
+        try:
+            # built by someone else since our lookup
+            waited = read(
+                {item_id: keys[item_id] for item_id in owned},
+                fresh=True
+            )
+            building = [item_id for item_id in owned if item_id not in waited]
+            if building:
+                values.update(build(building))
+        finally:
+            cache.delete_many([lock_key(keys[item_id]) for item_id in owned])
+        waited.update(wait_for(
+            {
+                item_id: keys[item_id]
+                for item_id in leaders
+                if item_id not in owned and item_id not in stale
+            },
+            deadline
+        ))
+    finally:
+        for item_id in leaders:
+            flights.land(keys[item_id])
+
+    for event in followers.values():
+        event.wait(max(0.0, deadline - time.monotonic()))
+    if followers:
+        waited.update(read({item_id: keys[item_id] for item_id in followers}))
+    values.update(waited)
+
+    # served stale, also when the builder failed or timed out
+    served_stale = {
+        item_id: data
+        for item_id, data in stale.items()
+        if item_id not in values
+    }
+    values.update(served_stale)
+    missing = [
+        item_id for item_id in keys
+        if item_id not in values and item_id not in building
+    ]
+    if missing:
+        values.update(build(missing))
+    return values, {
+        "built": len(building) + len(missing),
+        "waited": len(waited),
+        "stale": len(served_stale),
+    }
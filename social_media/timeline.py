@@ -0,0 +1,309 @@
+"""Materialized home timelines (fan-out-on-write).
+
+Every profile owns a list of ``TimelineEntry`` rows pointing at the newest
+posts of the profiles it follows. Rows are pushed when a post is created,
+backfilled on follow and pruned on unfollow, so reading the feed is a single
+range scan over the ``(owner, created_time)`` index. Fan-out does not trim,
+``trim_timelines`` periodically cuts timelines that grew past
+``TIMELINE_DEPTH``, until then the extra entries are simply not read.
+
+``FEED_MODE`` decides which authors are pushed. In "hybrid" mode authors
+flagged ``feed_pulled`` are never fanned out, their posts are pulled per
+author on read and k-way merged with the pushed timeline. "pull" skips
+timelines entirely and "push" fans out everyone.
+
+An author is flagged as soon as a follow takes them to
+``FEED_CELEBRITY_THRESHOLD`` followers, the entries pushed until then are
+deduplicated against the pulled posts. The flag is only cleared once they
+fell below ``FEED_CELEBRITY_RELEASE_THRESHOLD``, by ``switch_feed_modes``,
+which first copies their newest posts into the timelines of their
+followers so no post drops out of a feed.
+"""
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+from django.db.models import Count, F, Q, Window, prefetch_related_objects
+from django.db.models.functions import RowNumber
+
+from social_media.models import Post, TimelineEntry
+from user.models import UserFollowing, UserProfile
+
+FAN_OUT_BATCH_SIZE = 1000
+# posts of a released author created this long before the switch are
+# pushed once more, their fan-out may have seen the author still pulled
+SWITCH_MARGIN = timedelta(minutes=1)
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def trim_timelines(owner_ids) -> None:
+    """Drop entries that fall below TIMELINE_DEPTH for the given owners"""
+    excess = (
+        TimelineEntry.objects.filter(owner_id__in=owner_ids)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("owner_id"),
+                order_by=(F("created_time").desc(), F("post_id").desc()),
+            )
+        )
+        .filter(position__gt=settings.TIMELINE_DEPTH)
+        .values_list("id", flat=True)
+    )
+    ids = list(excess)
+    if ids:
+        TimelineEntry.objects.filter(id__in=ids).delete()
+
+
+def trim() -> int:
+    """Trim every timeline over TIMELINE_DEPTH, returns how many were"""
+    owner_ids = list(
+        TimelineEntry.objects.order_by()
+        .values("owner_id")
+        .annotate(entries=Count("id"))
+        .filter(entries__gt=settings.TIMELINE_DEPTH)
+        .values_list("owner_id", flat=True)
+    )
+    for batch in _batched(owner_ids, FAN_OUT_BATCH_SIZE):
+        trim_timelines(batch)
+    return len(owner_ids)
+
+
+def is_pushed(author_id: int) -> bool:
+    """Whether posts of the author are fanned out to follower timelines"""
+    if settings.FEED_MODE == "pull":
+        return False
+    if settings.FEED_MODE == "hybrid":
+        # read from the database, request.user.profile may be cached
+        return UserProfile.objects.filter(
+            id=author_id,
+            feed_pulled=False
+        ).exists()
+    return True
+
+
+def pull_celebrities(author_ids=None) -> int:
+    """Flag authors at FEED_CELEBRITY_THRESHOLD followers as pulled"""
+    if settings.FEED_MODE != "hybrid":
+        return 0
+    authors = UserProfile.objects.filter(
+        feed_pulled=False,
+        followers_count__gte=settings.FEED_CELEBRITY_THRESHOLD
+    )
+    if author_ids is not None:
+        authors = authors.filter(id__in=author_ids)
+    return authors.update(feed_pulled=True)
+
+
+def push_posts(author_id: int, since=None) -> None:
+    """Copy the newest posts of an author into all follower timelines"""
+    posts = Post.objects.filter(author_id=author_id)
+    if since is not None:
+        posts = posts.filter(created_time__gte=since)
+    posts = list(
+        posts.order_by("-created_time", "-id")
+        .values_list("id", "created_time")[:settings.TIMELINE_DEPTH]
+    )
+    if not posts:
+        return
+    follower_ids = (
+        UserFollowing.objects.filter(you_follow_to_id=author_id)
+        .values_list("your_followers_id", flat=True)
+    )
+    for owner_ids in _batched(follower_ids.iterator(), FAN_OUT_BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    owner_id=owner_id,
+                    post_id=post_id,
+                    created_time=created_time
+                )
+                for owner_id in owner_ids
+                for post_id, created_time in posts
+            ],
+            batch_size=FAN_OUT_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        trim_timelines(owner_ids)
+
+
+def push_released() -> int:
+    """Fan out authors below FEED_CELEBRITY_RELEASE_THRESHOLD again.
+
+    Timelines of the followers get the posts of the author before the
+    flag is cleared, posts created meanwhile are pushed once more after.
+    Returns how many authors were switched.
+    """
+    if settings.FEED_MODE != "hybrid":
+        return 0
+    released = list(
+        UserProfile.objects.filter(
+            feed_pulled=True,
+            followers_count__lt=settings.FEED_CELEBRITY_RELEASE_THRESHOLD
+        ).values_list("id", flat=True)
+    )
+    for author_id in released:
+        started = timezone.now()
+        push_posts(author_id)
+        UserProfile.objects.filter(id=author_id).update(feed_pulled=False)
+        push_posts(author_id, since=started - SWITCH_MARGIN)
+    return len(released)
+
+
+def fan_out_post(post: Post) -> None:
+    """Push a new post into the timeline of every follower of its author"""
+    if not is_pushed(post.author_id):
+        return
+    follower_ids = (
+        UserFollowing.objects.filter(you_follow_to_id=post.author_id)
+        .values_list("your_followers_id", flat=True)
+    )
+    for owner_ids in _batched(follower_ids.iterator(), FAN_OUT_BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    owner_id=owner_id,
+                    post_id=post.id,
+                    created_time=post.created_time
+                )
+                for owner_id in owner_ids
+            ],
+            ignore_conflicts=True
+        )
+
+
+def backfill(owner_id: int, author_ids) -> None:
+    """Copy the newest posts of freshly followed authors into a timeline"""
+    if settings.FEED_MODE == "pull":
+        return
+    authors = UserProfile.objects.filter(id__in=author_ids)
+    if settings.FEED_MODE == "hybrid":
+        authors = authors.filter(feed_pulled=False)
+    posts = (
+        Post.objects.filter(author__in=authors)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("author_id"),
+                order_by=(F("created_time").desc(), F("id").desc()),
+            )
+        )
+        .filter(position__lte=settings.TIMELINE_DEPTH)
+        .values_list("id", "created_time")
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                owner_id=owner_id,
+                post_id=post_id,
+                created_time=created_time
+            )
+            for post_id, created_time in posts
+        ],
+        batch_size=FAN_OUT_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    trim_timelines([owner_id])
+
+
+def prune(owner_id: int, author_ids) -> None:
+    """Remove posts of unfollowed authors from a timeline"""
+    TimelineEntry.objects.filter(
+        owner_id=owner_id,
+        post__author_id__in=author_ids
+    ).delete()
+
+
+def rebuild(owner_id: int) -> None:
+    """Recreate a timeline from scratch out of the current follow graph"""
+    TimelineEntry.objects.filter(owner_id=owner_id).delete()
+    backfill(owner_id, followed_authors(owner_id))
+
+
+def followed_authors(owner_id: int):
+    return UserFollowing.objects.filter(
+        your_followers_id=owner_id
+    ).values("you_follow_to_id")
+
+
+def _older_than(before, time_field, id_field) -> Q:
+    if before is None:
+        return Q()
+    created_time, pk = before
+    return (
+        Q(**{f"{time_field}__lt": created_time})
+        | Q(**{time_field: created_time, f"{id_field}__lt": pk})
+    )
+
+
+def timeline_posts(owner_id: int, before=None):
+    """Pushed posts of a timeline, newest first, read via the owner index"""
+    # a single filter() call keeps the keyset on the same timeline join
+    return Post.objects.filter(
+        Q(timeline_entries__owner_id=owner_id)
+        & _older_than(
+            before,
+            "timeline_entries__created_time",
+            "timeline_entries__post_id"
+        )
+    ).order_by(
+        "-timeline_entries__created_time",
+        "-timeline_entries__post_id"
+    )
+
+
+def author_posts(author_ids, before=None):
+    """Posts of the given authors, newest first"""
+    return Post.objects.filter(
+        Q(author_id__in=author_ids)
+        & _older_than(before, "created_time", "id")
+    ).order_by("-created_time", "-id")
+
+
+def read_feed(
+    owner_id: int,
+    limit: int,
+    before=None,
+    prefetch: bool = True
+) -> list[Post]:
+    """Return up to limit feed posts older than the (created_time, id) pair.
+
+    Pushed entries and the streams of pulled authors are each fetched
+    newest first and merged lazily by (created_time, id). Comments and
+    tags are prefetched unless prefetch is False.
+    """
+    if settings.FEED_MODE == "pull":
+        streams = [author_posts(followed_authors(owner_id), before)]
+    else:
+        streams = [timeline_posts(owner_id, before)]
+    if settings.FEED_MODE == "hybrid":
+        celebrities = UserProfile.objects.filter(
+            id__in=followed_authors(owner_id),
+            feed_pulled=True
+        ).values_list("id", flat=True)
+        streams += [
+            author_posts([author_id], before) for author_id in celebrities
+        ]
+
+    merged = heapq.merge(
+        *(stream.select_related("author")[:limit] for stream in streams),
+        key=lambda post: (post.created_time, post.id),
+        reverse=True
+    )
+    posts, seen = [], set()
+    for post in merged:
+        if post.id not in seen:
+            seen.add(post.id)
+            posts.append(post)
+        if len(posts) == limit:
+            break
+    if prefetch:
+        prefetch_related_objects(posts, "posts__user", "tags")
+    return posts
@@ -0,0 +1,101 @@
+"""Trending hashtags over a sliding window of time buckets.
+
+Every created post adds one to the HashtagBucket row of each of its tags
+for the current TRENDING_BUCKET_SECONDS bucket. ``refresh`` sums the
+buckets of the last TRENDING_WINDOW_SECONDS into the TRENDING_TOP_K most
+used tags and caches that ranking until the current bucket closes, so the
+trending endpoint reads one cache key instead of aggregating on every call.
+An expired ranking stays cached for one more bucket. ``top`` serves it
+while a single request ranks again, and concurrent misses wait for that
+request for at most LOCK_TIMEOUT seconds (``single_flight.fill``).
+"""
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from social_media import single_flight
+from social_media.models import HashtagBucket
+
+CACHE_KEY = "trending-hashtags"
+LOCK_TIMEOUT = 10
+
+
+def bucket_start(moment: datetime) -> datetime:
+    """Start of the bucket that moment falls into"""
+    timestamp = moment.timestamp()
+    timestamp -= timestamp % settings.TRENDING_BUCKET_SECONDS
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+def record(tag_ids: list[int], moment: datetime | None = None) -> None:
+    """Count one use of every tag in the bucket of moment (default now)"""
+    if not tag_ids:
+        return
+    start = bucket_start(moment or timezone.now())
+    with transaction.atomic():
+        HashtagBucket.objects.bulk_create(
+            [HashtagBucket(tag_id=tag_id, start=start) for tag_id in tag_ids],
+            ignore_conflicts=True
+        )
+        HashtagBucket.objects.filter(
+            tag_id__in=tag_ids,
+            start=start
+        ).update(count=F("count") + 1)
+
+
+def window_start(now: datetime) -> datetime:
+    return now - timedelta(seconds=settings.TRENDING_WINDOW_SECONDS)
+
+
+def refresh(now: datetime | None = None) -> list[dict]:
+    """Rank the tags of the current window and cache the top K"""
+    now = now or timezone.now()
+    ranking = (
+        HashtagBucket.objects.filter(start__gt=window_start(now))
+        .values("tag__hashtag")
+        .annotate(uses=Sum("count"))
+        .order_by("-uses", "tag__hashtag")
+    )
+    trending = [
+        {"hashtag": f"#{row['tag__hashtag']}", "count": row["uses"]}
+        for row in ranking[:settings.TRENDING_TOP_K]
+    ]
+    bucket_end = bucket_start(now) + timedelta(
+        seconds=settings.TRENDING_BUCKET_SECONDS
+    )
+    fresh_for = max(1, int((bucket_end - now).total_seconds()))
+    cache.set(
+        CACHE_KEY,
+        (time.time() + fresh_for, trending),
+        fresh_for + settings.TRENDING_BUCKET_SECONDS
+    )
+    return trending
+
+
+def prune(now: datetime | None = None) -> int:
+    """Delete buckets that have slid out of the window"""
+    now = now or timezone.now()
+    deleted, _ = HashtagBucket.objects.filter(
+        start__lte=window_start(now)
+    ).delete()
+    return deleted
+
+
+def top(limit: int | None = None) -> list[dict]:
+    """Cached ranking of the current window, ranked once when it expired"""
+    entry = cache.get(CACHE_KEY)
+    if entry is not None and entry[0] > time.time():
+        return entry[1][:limit]
+    stale = {} if entry is None else {CACHE_KEY: entry[1]}
+    values, _ = single_flight.fill(
+        {CACHE_KEY: CACHE_KEY},
+        stale,
+        lambda keys: {CACHE_KEY: refresh()},
+        LOCK_TIMEOUT
+    )
+    return values[CACHE_KEY][:limit]
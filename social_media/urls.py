@@ -11,7 +11,9 @@ from social_media.views import (
     CommentaryDeleteApiView,
     OwnCommentary,
     Likes,
-    LikedPostView
+    LikedPostView,
+    TrendingHashtagsView,
+    PostCacheStatsView
 )
 
 router = routers.DefaultRouter()
@@ -60,6 +62,16 @@ urlpatterns = [
         LikedPostView.as_view(),
         name="liked"
     ),
+    path(
+        "hashtags/trending/",
+        TrendingHashtagsView.as_view(),
+        name="trending-hashtags"
+    ),
+    path(
+        "posts/cache-stats/",
+        PostCacheStatsView.as_view(),
+        name="post-cache-stats"
+    ),
     path("", include(router.urls))
 ]
 
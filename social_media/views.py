@@ -1,16 +1,25 @@
 from rest_framework import viewsets, generics, status, mixins
 from rest_framework.decorators import action
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import ValidationError
+from django.db.models import F
 from django.db.models.query import QuerySet
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
-from django.http import HttpResponse, HttpRequest
+from django.http import Http404, HttpResponse, HttpRequest
 from rest_framework.viewsets import GenericViewSet
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db import IntegrityError, transaction
 
-from pagination import CommentaryPagination
+from conditional import ConditionalGetMixin, digest_etag
+from pagination import CommentaryPagination, PostPagination
+from renderers import StreamingListMixin, is_streaming
+
+from social_media import counters, post_cache, search, timeline, trending
+from social_media.hashtags import parse_hashtags
+from social_media.representation import PostRepresentation
 
 from social_media.permissions import (
     IsOwnerOrReadOnly,
@@ -20,12 +29,16 @@ from social_media.models import Post, Commentary, Like
 from social_media.serializers import (
     PostSerializer,
     CommentarySerializer,
-    LikeSerializer,
     CommentaryListSerializer,
+    CommentaryHistorySerializer,
     CommentaryPostSerializer,
-    PostListSerializer
+    LikeHistorySerializer,
+    PostBatchSerializer,
+    PostListSerializer,
+    PostCacheStatsSerializer,
+    TrendingHashtagSerializer
 )
-from user.models import UserProfile
+from user.authentication import API_AUTHENTICATION_CLASSES
 
 
 def params_to_ints(qs):
@@ -33,51 +46,213 @@ def params_to_ints(qs):
     return [int(str_id) for str_id in qs.split(",")]
 
 
+def batch_ids(request) -> list[int]:
+    """Distinct ids of the ids parameter in the given order"""
+    try:
+        ids = list(dict.fromkeys(params_to_ints(request.query_params["ids"])))
+    except (KeyError, ValueError):
+        raise ValidationError(
+            {"ids": "Pass a comma separated list of ids (ex. ?ids=1,2,3)"}
+        )
+    if len(ids) > settings.BATCH_MAX_IDS:
+        raise ValidationError(
+            {"ids": f"At most {settings.BATCH_MAX_IDS} ids per request"}
+        )
+    return ids
+
+
+BATCH_PARAMETER = OpenApiParameter(
+    "ids",
+    type={"type": "list", "items": {"type": "number"}},
+    required=True,
+    description="Comma separated ids (ex. ?ids=4,2,7)",
+)
+
+
+REPRESENTATION_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description=(
+                "Only these fields of every post "
+                "(ex. ?fields=id,title,author)"
+        ),
+    ),
+    OpenApiParameter(
+        "expand",
+        type=OpenApiTypes.STR,
+        description="Embed the comments in post lists (ex. ?expand=comments)",
+    ),
+    OpenApiParameter(
+        "comments_limit",
+        type=OpenApiTypes.INT,
+        description=(
+                "Embed only the latest comments of every post "
+                "(ex. ?comments_limit=3)"
+        ),
+    ),
+]
+
+
+def render_posts(post_ids, serializer_class, request=None) -> list[dict]:
+    """Post representations from the post cache, loading only the misses"""
+    representation = PostRepresentation.from_request(
+        request,
+        serializer_class
+    )
+    return post_cache.render(
+        post_ids,
+        representation.kind,
+        representation.serialize,
+        representation.load,
+        request
+    )
+
+
+def post_response(pk, request=None) -> Response:
+    """Detail representation of a post, 404 if it does not exist"""
+    try:
+        posts = render_posts([int(pk)], PostSerializer, request)
+    except ValueError:
+        posts = []
+    if not posts:
+        raise Http404
+    return Response(posts[0])
+
+
+def post_validators(pk, request) -> tuple[str | None, int | None]:
+    """ETag and Last-Modified of a post from its post cache version"""
+    try:
+        post_id = int(pk)
+    except ValueError:
+        return None, None
+    version = post_cache.versions([post_id])[post_id]
+    return digest_etag(
+        PostRepresentation.from_request(request, PostSerializer).kind,
+        post_id,
+        version
+    ), version // 10 ** 9
+
+
+class CachedPostListMixin(StreamingListMixin, ConditionalGetMixin):
+    """Assemble post list pages from the post cache.
+
+    The page query only reads ids and ordering values, posts missing from
+    the cache are then loaded with their relations by id. The ETag of a
+    page is built from the ids and cache versions of its posts, so a
+    matching request costs the page query and one cache read. Streamed
+    pages are rendered in chunks of the paginator's iterator_chunk_size.
+    """
+
+    post_page = None
+
+    def paginate_posts(self) -> list[Post]:
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.paginate_queryset(
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .only("id", "created_time")
+        )
+
+    def get_post_page(self) -> list[Post]:
+        if self.post_page is None:
+            self.post_page = self.paginate_posts()
+        return self.post_page
+
+    def get_validators(self):
+        ids = [post.id for post in self.get_post_page()]
+        post_versions = post_cache.versions(ids)
+        return digest_etag(
+            PostRepresentation.from_request(
+                self.request,
+                self.get_serializer_class()
+            ).kind,
+            [(post_id, post_versions[post_id]) for post_id in ids],
+            self.paginator.has_next
+        ), None
+
+    @extend_schema(parameters=REPRESENTATION_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        ids = [post.id for post in self.get_post_page()]
+        if is_streaming(request):
+            return self.stream_page(self.render_chunks(ids))
+        return self.get_paginated_response(
+            render_posts(ids, self.get_serializer_class(), request)
+        )
+
+    def render_chunks(self, ids):
+        size = self.paginator.iterator_chunk_size
+        for start in range(0, len(ids), size):
+            yield from render_posts(
+                ids[start:start + size],
+                self.get_serializer_class(),
+                self.request
+            )
+
+
 def like_post(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+    """Like a post with one insert guarded by the post_like constraint"""
     pk = kwargs.get("pk")
     user = request.user.profile
     post = get_object_or_404(Post, pk=pk)
 
-    if user.id in [post.user_id for post in post.post_likes.all()]:
+    try:
+        with transaction.atomic():
+            Like.objects.create(user=user, post=post)
+            counters.change_likes(post.id, 1)
+    except IntegrityError:
         return Response({"message": "You already liked this post"})
-    Like.objects.create(user=user, post=post)
     return Response({"message": "post was liked"})
 
 
 def unlike_post(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+    """Unlike a post with one delete, reporting whether a like existed"""
     pk = kwargs.get("pk")
     user = request.user.profile
     post = get_object_or_404(Post, pk=pk)
-    like = Like.objects.filter(user=user, post=post).first()
-    if like:
-        like.delete()
+
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post=post).delete()
+        if deleted:
+            counters.change_likes(post.id, -1)
+    if deleted:
         return Response({"message": "you have unliked post"})
     return Response({"message": "you never liked post"})
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Post.objects.select_related("author")
-        .prefetch_related("posts", "post_likes")
-    )
+class PostViewSet(CachedPostListMixin, viewsets.ModelViewSet):
+    queryset = Post.objects.select_related("author").prefetch_related("tags")
     serializer_class = PostSerializer
     permission_classes = (IsOwnerOrReadOnly,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
+    pagination_class = PostPagination
+
+    @property
+    def cursor_ordering(self):
+        """Searches are paginated by rank, other lists by time"""
+        if self.request.query_params.get("q"):
+            return ("-rank", "-id")
+        return None
 
     def get_queryset(self) -> QuerySet:
         queryset = self.queryset
+        if self.action != "list":
+            queryset = queryset.prefetch_related("posts__user")
+        q = self.request.query_params.get("q")
         title = self.request.query_params.get("title")
         content = self.request.query_params.get("content")
         hashtags = self.request.query_params.get("hashtags")
         author = self.request.query_params.get("author")
         created_time = self.request.query_params.get("created_time")
 
+        if q:
+            queryset = search.search_posts(queryset, q)
         if title:
             queryset = queryset.filter(title__icontains=title)
         if content:
             queryset = queryset.filter(content__icontains=content)
-        if hashtags:
-            queryset = queryset.filter(hashtags__icontains=hashtags)
+        for tag in parse_hashtags(hashtags):
+            queryset = queryset.filter(tags__hashtag=tag)
         if author:
             author_id = params_to_ints(author)
             queryset = queryset.filter(author__id__in=author_id)
@@ -91,6 +266,44 @@ class PostViewSet(viewsets.ModelViewSet):
             return PostListSerializer
         return PostSerializer
 
+    def get_validators(self):
+        if self.action == "retrieve":
+            return post_validators(self.kwargs["pk"], self.request)
+        if self.action == "list":
+            return super().get_validators()
+        if self.action == "batch":
+            ids = batch_ids(self.request)
+            post_versions = post_cache.versions(ids)
+            return digest_etag(
+                PostRepresentation.from_request(
+                    self.request,
+                    PostSerializer
+                ).kind,
+                [(post_id, post_versions[post_id]) for post_id in ids]
+            ), None
+        return None, None
+
+    @extend_schema(parameters=REPRESENTATION_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return post_response(kwargs["pk"], request)
+
+    @extend_schema(
+        parameters=[BATCH_PARAMETER, *REPRESENTATION_PARAMETERS],
+        responses=PostBatchSerializer,
+    )
+    @action(methods=["GET"], detail=False)
+    def batch(self, request, format=None):
+        """Posts by id in the requested order and the ids not found"""
+        ids = batch_ids(request)
+        posts = render_posts(ids, PostSerializer, request)
+        found = {post["id"] for post in posts}
+        return Response(
+            {
+                "results": posts,
+                "missing": [post_id for post_id in ids if post_id not in found]
+            }
+        )
+
     @action(
         methods=["GET", "PUT"],
         detail=True,
@@ -126,6 +339,14 @@ class PostViewSet(viewsets.ModelViewSet):
 
     @extend_schema(
         parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                description=(
+                        "Full-text search in title and content, "
+                        "best matches first (ex. ?q=election results)"
+                ),
+            ),
             OpenApiParameter(
                 "title",
                 type=OpenApiTypes.STR,
@@ -139,7 +360,10 @@ class PostViewSet(viewsets.ModelViewSet):
             OpenApiParameter(
                 "hashtags",
                 type=OpenApiTypes.STR,
-                description="Filter post by hashtags (ex. ?hashtags=#2024)",
+                description=(
+                        "Filter post by hashtags, posts must have every "
+                        "given tag (ex. ?hashtags=#2024,#news)"
+                ),
             ),
             OpenApiParameter(
                 "author",
@@ -154,42 +378,50 @@ class PostViewSet(viewsets.ModelViewSet):
                         "(ex. ?created_time=2024-01-13)"
                 ),
             ),
+            *REPRESENTATION_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
-class OwnPostView(generics.ListAPIView):
+class OwnPostView(CachedPostListMixin, generics.ListAPIView):
     queryset = Post.objects.all()
     serializer_class = PostListSerializer
     permission_classes = (IsOwnerOrReadOnly,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
+    pagination_class = PostPagination
 
     def get_queryset(self):
         user = self.request.user.profile.id
-        return (
-            Post.objects.select_related("author")
-            .prefetch_related("posts", "post_likes")
-            .filter(author_id=user)
-        )
+        return Post.objects.select_related("author").prefetch_related(
+            "tags"
+        ).filter(author_id=user)
 
 
-class FollowingPostView(generics.ListAPIView):
+class FollowingPostView(CachedPostListMixin, generics.ListAPIView):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = (IsOwnerOrReadOnly,)
-    authentication_classes = (TokenAuthentication,)
-
-    def get_queryset(self):
-        user = self.request.user.profile.id
-        followers = UserProfile.objects.get(id=user).followers.all()
-        ids = [users.you_follow_to_id for users in followers]
-
-        return Post.objects.filter(author__id__in=ids)
+    authentication_classes = API_AUTHENTICATION_CLASSES
+    pagination_class = PostPagination
+
+    def paginate_posts(self):
+        paginator = self.paginator
+        paginator.prepare(self.request, self)
+        if paginator.position is not None:
+            paginator.position = paginator.coerce_position(self.queryset)
+        posts = timeline.read_feed(
+            self.request.user.profile.id,
+            paginator.page_size + 1,
+            paginator.position,
+            prefetch=False
+        )
+        return paginator.paginate_list(posts)
 
 
 class CommentaryViewSet(
+    StreamingListMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.DestroyModelMixin,
@@ -198,9 +430,14 @@ class CommentaryViewSet(
     queryset = Commentary.objects.select_related("user", "post")
     serializer_class = CommentaryListSerializer
     permission_classes = (IsAdminUser,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     pagination_class = CommentaryPagination
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            counters.change_comments(instance.post_id, -1)
+
     def get_queryset(self) -> QuerySet:
         queryset = self.queryset
         user = self.request.query_params.get("user_id")
@@ -222,8 +459,15 @@ class CommentaryViewSet(
         if created_time:
             queryset = queryset.filter(created_time__date=created_time)
 
+        if self.action == "list":
+            queryset = CommentaryHistorySerializer.project(queryset)
         return queryset
 
+    def get_serializer_class(self):
+        if self.action == "list":
+            return CommentaryHistorySerializer
+        return CommentaryListSerializer
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -260,18 +504,22 @@ class CommentaryViewSet(
         return super().list(request, *args, **kwargs)
 
 
-class LikeViewSet(mixins.ListModelMixin, GenericViewSet):
-    queryset = Like.objects.select_related("user", "post")
-    serializer_class = LikeSerializer
+class LikeViewSet(
+    StreamingListMixin,
+    mixins.ListModelMixin,
+    GenericViewSet
+):
+    queryset = LikeHistorySerializer.project(Like.objects.all())
+    serializer_class = LikeHistorySerializer
     permission_classes = (IsAdminUser,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     pagination_class = CommentaryPagination
 
 
 class CommentView(APIView):
     queryset = Commentary.objects.all()
     permission_classes = (IsAuthenticated,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     serializer_class = CommentarySerializer
 
     def get_object(self, *args, **kwargs):
@@ -279,20 +527,20 @@ class CommentView(APIView):
         return get_object_or_404(Post, pk=pk)
 
     def get(self, request, pk, format=None):
-        post = self.get_object(pk)
-        serializer = PostSerializer(post)
-        return Response(serializer.data)
+        return post_response(pk)
 
     def post(self, request, *args, **kwargs):
         user = self.request.user.profile
         post = self.get_object()
         content = self.request.data["content"]
         if content:
-            comment = Commentary.objects.create(
-                user=user,
-                post=post,
-                content=content
-            )
+            with transaction.atomic():
+                comment = Commentary.objects.create(
+                    user=user,
+                    post=post,
+                    content=content
+                )
+                counters.change_comments(post.id, 1)
             serializer = CommentaryPostSerializer(comment)
             return Response(
                 ("Your commentary was posted", serializer.data),
@@ -303,7 +551,7 @@ class CommentView(APIView):
 
 class CommentaryDeleteApiView(generics.DestroyAPIView):
     permission_classes = (IsOwnerOrReadOnlyDeleteComment,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
 
     def get_object(self, *args, **kwargs):
         pk = self.kwargs.get("pk")
@@ -318,15 +566,18 @@ class CommentaryDeleteApiView(generics.DestroyAPIView):
     def delete(self, request, *args, **kwargs):
         pk = self.kwargs.get("pk")
         commentary = get_object_or_404(Commentary, pk=pk)
-        commentary.delete()
+        with transaction.atomic():
+            commentary.delete()
+            counters.change_comments(commentary.post_id, -1)
         return Response({"message": "commentary was successful deleted"})
 
 
-class OwnCommentary(generics.ListAPIView):
+class OwnCommentary(StreamingListMixin, generics.ListAPIView):
     serializer_class = CommentaryListSerializer
     queryset = Commentary.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     permission_classes = (IsAuthenticated,)
+    pagination_class = CommentaryPagination
 
     def get_queryset(self):
         user = self.request.user.profile.id
@@ -338,16 +589,14 @@ class OwnCommentary(generics.ListAPIView):
 
 class Likes(APIView):
     permission_classes = (IsAuthenticated,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
 
     def get_object(self, *args, **kwargs):
         pk = self.kwargs.get("pk")
         return get_object_or_404(Post, pk=pk)
 
     def get(self, request, pk, format=None):
-        post = self.get_object(pk)
-        serializer = PostSerializer(post)
-        return Response(serializer.data)
+        return post_response(pk)
 
     def post(self, request, *args, **kwargs):
         return like_post(request, *args, **kwargs)
@@ -356,18 +605,64 @@ class Likes(APIView):
         return unlike_post(request, *args, **kwargs)
 
 
-class LikedPostView(generics.ListAPIView):
+class LikedPostView(CachedPostListMixin, generics.ListAPIView):
     queryset = Post.objects.all()
     serializer_class = PostListSerializer
     permission_classes = (IsOwnerOrReadOnly,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
+    pagination_class = PostPagination
+    cursor_ordering = ("-liked_at", "-like_id")
 
     def get_queryset(self):
-        user = self.request.user.profile.id
-        liked = UserProfile.objects.get(id=user).likes.all()
-        ids = [post.post_id for post in liked]
-        return (
-            Post.objects.select_related("author")
-            .prefetch_related("posts", "post_likes")
-            .filter(id__in=ids)
+        """Liked posts joined through the likes, latest like first"""
+        return Post.objects.select_related("author").prefetch_related(
+            "tags"
+        ).filter(
+            post_likes__user_id=self.request.user.profile.id
+        ).annotate(
+            liked_at=F("post_likes__created_time"),
+            like_id=F("post_likes__id")
         )
+
+
+class TrendingHashtagsView(APIView):
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description=(
+                        "Number of hashtags, at most TRENDING_TOP_K "
+                        "(ex. ?limit=10)"
+                ),
+            ),
+        ],
+        responses=TrendingHashtagSerializer(many=True),
+    )
+    def get(self, request, format=None):
+        """Most used hashtags of the trending window, most used first"""
+        try:
+            limit = int(request.query_params["limit"])
+        except (KeyError, ValueError):
+            limit = None
+        if limit is not None and limit <= 0:
+            limit = None
+        serializer = TrendingHashtagSerializer(
+            trending.top(limit),
+            many=True
+        )
+        return Response(serializer.data)
+
+
+class PostCacheStatsView(APIView):
+    permission_classes = (IsAdminUser,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
+
+    @extend_schema(responses=PostCacheStatsSerializer)
+    def get(self, request, format=None):
+        """Hit ratio and latency of the post cache in this process"""
+        serializer = PostCacheStatsSerializer(post_cache.stats.snapshot())
+        return Response(serializer.data)
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=("GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"),
+        default="GET"
+    )
+    path = serializers.RegexField(r"^/", max_length=2000)
+    body = serializers.JSONField(required=False, default=None)
+
+
+class SubResponseSerializer(serializers.Serializer):
+    status = serializers.IntegerField(read_only=True)
+    headers = serializers.DictField(
+        child=serializers.CharField(),
+        read_only=True
+    )
+    body = serializers.JSONField(read_only=True)
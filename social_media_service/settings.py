@@ -94,9 +94,30 @@ DATABASES = {
         "USER": os.environ.get("POSTGRES_USER"),
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
         "PORT": os.environ.get("DB_PORT"),
+        # seconds a connection is kept for the next request of its thread
+        "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 0)),
     }
 }
 
+# Cache shared by all processes: rendered posts with their versions and
+# locks, trending hashtags and throttle histories. Without REDIS_URL every
+# process keeps its own in-memory cache, which is only correct with one
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 100000},
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -152,16 +173,105 @@ INTERNAL_IPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "renderers.FastJSONRenderer",
+        "renderers.StreamingJSONRenderer",
+        "renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer"
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser"
+    ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "throttling.AnonRateThrottle",
+        "throttling.UserRateThrottle"
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/day",
         "user": "1000/day"
-    }
+    },
+    # serializers keep datetimes as they are and the renderer encodes
+    # them, as ISO 8601 text in JSON and epoch milliseconds in MessagePack
+    "DATETIME_FORMAT": None
 }
 
+# Number of newest posts kept in every materialized home timeline
+TIMELINE_DEPTH = int(os.environ.get("TIMELINE_DEPTH", 800))
+
+# How following feeds are assembled: "push" fans every post out on write,
+# "pull" merges followed authors on read, "hybrid" pulls only authors that
+# reached FEED_CELEBRITY_THRESHOLD followers and pushes everyone else.
+# Pulled authors are pushed again below FEED_CELEBRITY_RELEASE_THRESHOLD
+FEED_MODE = os.environ.get("FEED_MODE", "hybrid")
+FEED_CELEBRITY_THRESHOLD = int(
+    os.environ.get("FEED_CELEBRITY_THRESHOLD", 10000)
+)
+FEED_CELEBRITY_RELEASE_THRESHOLD = int(
+    os.environ.get(
+        "FEED_CELEBRITY_RELEASE_THRESHOLD",
+        FEED_CELEBRITY_THRESHOLD * 8 // 10
+    )
+)
+
+# "direct" updates Post.likes_count in place, "buffered" appends like deltas
+# that the flush_like_deltas command folds into the counter periodically
+LIKE_COUNTER_MODE = os.environ.get("LIKE_COUNTER_MODE", "direct")
+
+# Trending hashtags count tag uses in buckets of TRENDING_BUCKET_SECONDS and
+# rank the TRENDING_TOP_K most used tags of the last TRENDING_WINDOW_SECONDS
+TRENDING_BUCKET_SECONDS = int(os.environ.get("TRENDING_BUCKET_SECONDS", 300))
+TRENDING_WINDOW_SECONDS = int(
+    os.environ.get("TRENDING_WINDOW_SECONDS", 86400)
+)
+TRENDING_TOP_K = int(os.environ.get("TRENDING_TOP_K", 50))
+
+# Seconds after which a process rebuilds its name autocomplete index, it
+# only sees profile changes made by other processes after a rebuild
+AUTOCOMPLETE_MAX_AGE = int(os.environ.get("AUTOCOMPLETE_MAX_AGE", 300))
+
+# Resolved API tokens are cached per process (LRU of AUTH_TOKEN_CACHE_SIZE
+# entries for AUTH_TOKEN_CACHE_TTL seconds) and, when AUTH_TOKEN_CACHE_ALIAS
+# names one of CACHES, in that shared cache as well. Logouts only clear the
+# shared copy for other processes, so with a shared cache they keep their
+# local copy for AUTH_TOKEN_LOCAL_TTL seconds instead
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_CACHE_SIZE", 10000))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", 60))
+AUTH_TOKEN_CACHE_ALIAS = os.environ.get("AUTH_TOKEN_CACHE_ALIAS") or None
+AUTH_TOKEN_LOCAL_TTL = float(os.environ.get("AUTH_TOKEN_LOCAL_TTL", 2))
+
+# Lifetime of the signed "Bearer" access tokens issued at login and by the
+# refresh endpoint, and how often a process pulls logouts of other processes
+ACCESS_TOKEN_LIFETIME = int(os.environ.get("ACCESS_TOKEN_LIFETIME", 300))
+ACCESS_TOKEN_REVOCATION_SYNC = int(
+    os.environ.get("ACCESS_TOKEN_REVOCATION_SYNC", 5)
+)
+
+# Seconds a rendered post stays in the default cache, changes to a post
+# replace its cached rendering right away. Expired renderings are served
+# for POST_CACHE_STALE_SECONDS more while one request renders them again,
+# and concurrent misses wait up to POST_CACHE_LOCK_TIMEOUT for that request.
+# Post versions, which ETags are built from, expire after
+# POST_CACHE_VERSION_TTL seconds and then start over with a new version
+POST_CACHE_TTL = int(os.environ.get("POST_CACHE_TTL", 300))
+POST_CACHE_VERSION_TTL = int(
+    os.environ.get("POST_CACHE_VERSION_TTL", 86400)
+)
+POST_CACHE_STALE_SECONDS = int(
+    os.environ.get("POST_CACHE_STALE_SECONDS", 60)
+)
+POST_CACHE_LOCK_TIMEOUT = int(os.environ.get("POST_CACHE_LOCK_TIMEOUT", 5))
+
+# Most ids a single posts/batch/ or users/batch/ request may ask for
+BATCH_MAX_IDS = int(os.environ.get("BATCH_MAX_IDS", 100))
+
+# Most sub-requests of one /api/batch/ call, and the threads serving its
+# consecutive GET sub-requests concurrently
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", 20))
+BATCH_MAX_WORKERS = int(os.environ.get("BATCH_MAX_WORKERS", 4))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Social media API",
     "DESCRIPTION": "Documentation for Social media API",
@@ -24,6 +24,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView
 )
 
+from social_media_service.views import BatchView
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -41,4 +43,5 @@ urlpatterns = [
     ),
     path("api/user/", include("user.urls", namespace="user")),
     path("api/social/", include("social_media.urls", namespace="social")),
+    path("api/batch/", BatchView.as_view(), name="batch"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
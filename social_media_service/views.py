@@ -0,0 +1,196 @@
+"""Batch endpoint that runs many API requests in one HTTP call.
+
+POST /api/batch/ takes a list of {"method", "path", "body"} sub-requests
+and returns a list of {"status", "headers", "body"} in the same order.
+The batch is authenticated and throttled once. Every sub-request then
+goes through the URL resolver and its view in-process with the user of
+the batch, permissions are still checked per view. Only API views can
+be batched, other paths like the admin answer 404.
+
+Runs of consecutive GET, HEAD and OPTIONS sub-requests are served
+concurrently by a pool of BATCH_MAX_WORKERS threads per process. Any
+other method waits for everything before it and runs alone, so a batch
+may write and read its own writes back. Pool threads handle database
+connections like request threads do, set CONN_MAX_AGE to reuse them.
+"""
+import copy
+import functools
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.urls import Resolver404, get_script_prefix, resolve
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from social_media_service.serializers import (
+    SubRequestSerializer,
+    SubResponseSerializer,
+)
+from throttling import BatchRateThrottle
+from user.authentication import API_AUTHENTICATION_CLASSES
+
+logger = logging.getLogger(__name__)
+
+# response headers passed on to the client of a batch
+FORWARDED_HEADERS = ("ETag", "Last-Modified", "Location", "Retry-After")
+
+
+def error(status_code: int, detail: str) -> dict:
+    return {"status": status_code, "headers": {}, "body": {"detail": detail}}
+
+
+@functools.lru_cache
+def get_executor(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(workers, thread_name_prefix="batch")
+
+
+class BatchView(APIView):
+    authentication_classes = API_AUTHENTICATION_CLASSES
+    permission_classes = (IsAuthenticated,)
+    throttle_classes = (BatchRateThrottle,)
+
+    def get_cost(self, request) -> int:
+        """Requests of the user rate a batch is charged with"""
+        if isinstance(request.data, list):
+            return max(1, min(len(request.data), settings.BATCH_MAX_REQUESTS))
+        return 1
+
+    @extend_schema(
+        request=SubRequestSerializer(many=True),
+        responses=SubResponseSerializer(many=True),
+    )
+    def post(self, request, format=None):
+        """Run a list of API requests and return their responses in order"""
+        serializer = SubRequestSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        calls = serializer.validated_data
+        if not calls:
+            raise ValidationError("Pass a list of sub-requests")
+        if len(calls) > settings.BATCH_MAX_REQUESTS:
+            raise ValidationError(
+                f"At most {settings.BATCH_MAX_REQUESTS} sub-requests "
+                f"per batch"
+            )
+
+        # thread local, read it before dispatching to workers
+        self.script_prefix = get_script_prefix()
+        results = [None] * len(calls)
+        reads = []
+        for index, call in enumerate(calls):
+            if call["method"] in SAFE_METHODS:
+                reads.append(index)
+                continue
+            self.run_concurrently(reads, calls, results)
+            reads = []
+            results[index] = self.perform(call)
+        self.run_concurrently(reads, calls, results)
+        return Response(results, status=status.HTTP_200_OK)
+
+    def run_concurrently(self, indexes, calls, results) -> None:
+        if len(indexes) < 2:
+            for index in indexes:
+                results[index] = self.perform(calls[index])
+            return
+        executor = get_executor(settings.BATCH_MAX_WORKERS)
+        futures = {
+            index: executor.submit(self.perform_in_pool, calls[index])
+            for index in indexes
+        }
+        for index, future in futures.items():
+            results[index] = future.result()
+
+    def perform_in_pool(self, call) -> dict:
+        # what request_started and request_finished do for request threads
+        close_old_connections()
+        try:
+            return self.perform(call)
+        finally:
+            close_old_connections()
+
+    def sub_request(self, call, path_info, query) -> WSGIRequest:
+        body = b"" if call["body"] is None else json.dumps(
+            call["body"]
+        ).encode()
+        environ = {
+            key: value
+            for key, value in self.request.META.items()
+            if not key.startswith("HTTP_IF_")
+        }
+        environ.update({
+            "REQUEST_METHOD": call["method"],
+            "PATH_INFO": path_info,
+            "QUERY_STRING": query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(body)),
+            "HTTP_ACCEPT": "application/json",
+            "wsgi.input": io.BytesIO(body),
+        })
+        sub_request = WSGIRequest(environ)
+        sub_request.batched = True
+        sub_request._force_auth_user = copy.copy(self.request.user)
+        sub_request._force_auth_token = self.request.auth
+        return sub_request
+
+    def perform(self, call) -> dict:
+        path, _, query = call["path"].partition("?")
+        path_info = path
+        if path.startswith(self.script_prefix):
+            path_info = "/" + path[len(self.script_prefix):]
+        try:
+            match = resolve(path_info)
+        except Resolver404:
+            return error(status.HTTP_404_NOT_FOUND, "Not found.")
+        view_class = getattr(match.func, "cls", None)
+        if not (
+            isinstance(view_class, type) and issubclass(view_class, APIView)
+        ):
+            return error(status.HTTP_404_NOT_FOUND, "Not found.")
+        if view_class is BatchView:
+            return error(
+                status.HTTP_400_BAD_REQUEST,
+                "Batches cannot be nested."
+            )
+
+        sub_request = self.sub_request(call, path_info, query)
+        sub_request.resolver_match = match
+        try:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception("Sub-request %s %s failed", call["method"], path)
+            return error(
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "Server error."
+            )
+        return {
+            "status": response.status_code,
+            "headers": {
+                header: response[header]
+                for header in FORWARDED_HEADERS
+                if header in response
+            },
+            "body": self.body_of(response),
+        }
+
+    @staticmethod
+    def body_of(response):
+        if isinstance(response, Response):
+            return response.data
+        if response.streaming:
+            content = b"".join(response.streaming_content)
+        else:
+            content = response.content
+        if not content:
+            return None
+        try:
+            return json.loads(content)
+        except ValueError:
+            return content.decode(errors="replace")
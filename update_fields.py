@@ -0,0 +1,30 @@
+from rest_framework.utils import model_meta
+
+
+class UpdateFieldsMixin:
+    """ModelSerializer mixin saving updates with ``update_fields``.
+
+    Only the validated fields and ``auto_now`` fields are written, so
+    columns changed meanwhile by other requests, like the counters kept
+    with F() updates, are not overwritten with the values the instance
+    was loaded with.
+    """
+
+    def update(self, instance, validated_data):
+        info = model_meta.get_field_info(instance)
+        fields, many_to_many = [], {}
+        for attr, value in validated_data.items():
+            if attr in info.relations and info.relations[attr].to_many:
+                many_to_many[attr] = value
+            else:
+                setattr(instance, attr, value)
+                fields.append(attr)
+        fields += [
+            field.name
+            for field in instance._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        ]
+        instance.save(update_fields=fields)
+        for attr, value in many_to_many.items():
+            getattr(instance, attr).set(value)
+        return instance
@@ -0,0 +1,207 @@
+"""Token authentication with a cache of resolved tokens.
+
+DRF's TokenAuthentication joins Token and User on every request and the
+views then load ``request.user.profile`` with one more query. The class
+here loads token, user and profile in one query on a miss and keeps the
+pickled result in a bounded in-process LRU for AUTH_TOKEN_CACHE_TTL
+seconds, optionally backed by the Django cache named in
+AUTH_TOKEN_CACHE_ALIAS that is shared between processes. A hit costs no
+queries, and every hit unpickles fresh objects, so requests never share
+model instances.
+
+Deleting a token (logout) and saving or deleting its user or profile
+invalidates the entry in this process and in the shared cache. Other
+processes drop their local copy after at most AUTH_TOKEN_LOCAL_TTL
+seconds when the shared cache is configured, AUTH_TOKEN_CACHE_TTL
+seconds otherwise.
+
+SignedTokenAuthentication accepts the stateless "Bearer" access tokens of
+user.tokens instead, see there.
+"""
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from drf_spectacular.plumbing import build_bearer_security_scheme_object
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from user import tokens
+from user.models import User, UserProfile
+
+
+class TokenCache:
+    """Bounded LRU of pickled tokens that expire after ttl seconds"""
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, payload = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: bytes) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, payload)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache(
+    settings.AUTH_TOKEN_CACHE_SIZE,
+    settings.AUTH_TOKEN_LOCAL_TTL
+    if settings.AUTH_TOKEN_CACHE_ALIAS
+    else settings.AUTH_TOKEN_CACHE_TTL
+)
+
+
+def shared_cache():
+    alias = settings.AUTH_TOKEN_CACHE_ALIAS
+    return caches[alias] if alias else None
+
+
+def shared_key(key: str) -> str:
+    """Never put raw tokens in a shared cache"""
+    return "auth-token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate(*keys: str) -> None:
+    """Forget cached tokens, call whenever token, user or profile change"""
+    shared = shared_cache()
+    for key in keys:
+        token_cache.delete(key)
+        if shared is not None:
+            shared.delete(shared_key(key))
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        payload = token_cache.get(key)
+        shared = shared_cache()
+        if payload is None and shared is not None:
+            payload = shared.get(shared_key(key))
+            if payload is not None:
+                token_cache.set(key, payload)
+
+        if payload is None:
+            token = self.load_token(key)
+            payload = pickle.dumps(token)
+            token_cache.set(key, payload)
+            if shared is not None:
+                shared.set(
+                    shared_key(key),
+                    payload,
+                    settings.AUTH_TOKEN_CACHE_TTL
+                )
+        token = pickle.loads(payload)
+        return (token.user, token)
+
+    def load_token(self, key):
+        """Token with user and profile in one query, checked like DRF"""
+        model = self.get_model()
+        try:
+            token = model.objects.select_related("user__profile").get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+        return token
+
+
+def deferred(model, **values):
+    """Instance with only values loaded, other fields load on access"""
+    names = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.attname in values
+    ]
+    return model.from_db(
+        DEFAULT_DB_ALIAS,
+        names,
+        [values[name] for name in names]
+    )
+
+
+class SignedTokenAuthentication(TokenAuthentication):
+    """Stateless access tokens sent as "Authorization: Bearer <token>".
+
+    request.user and request.user.profile are built from the token claims
+    with every other field deferred, so ids cost no queries and reading
+    any other field loads it from the database.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate_credentials(self, key):
+        try:
+            claims = tokens.verify(key)
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed(_("Token expired."))
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        if tokens.revocations.is_revoked(claims["u"], claims["t"]):
+            raise exceptions.AuthenticationFailed(_("Token revoked."))
+
+        user = deferred(
+            User,
+            id=claims["u"],
+            is_active=True,
+            is_staff=claims["s"]
+        )
+        if claims["p"] is not None:
+            user.profile = deferred(
+                UserProfile,
+                id=claims["p"],
+                email_id=claims["u"]
+            )
+        return (user, claims)
+
+
+class SignedTokenScheme(OpenApiAuthenticationExtension):
+    target_class = "user.authentication.SignedTokenAuthentication"
+    name = "signedTokenAuth"
+    priority = 1
+
+    def get_security_definition(self, auto_schema):
+        return build_bearer_security_scheme_object(
+            header_name="Authorization",
+            token_prefix=self.target.keyword,
+            bearer_format="Signed",
+        )
+
+
+API_AUTHENTICATION_CLASSES = (
+    SignedTokenAuthentication,
+    CachingTokenAuthentication,
+)
@@ -0,0 +1,202 @@
+"""In-memory prefix index for user name autocomplete.
+
+Normalized full names live in one sorted list with a parallel array of
+profile ids, a prefix query is a binary search followed by a short walk,
+so lookups take microseconds without touching the database. Every word
+of a name starts an entry, "olga ivanova" is found by "ol" and "iva".
+
+The index is built lazily on the first query of a process and kept up to
+date by the UserProfile signals of that process. Other processes only
+see those changes after AUTOCOMPLETE_MAX_AGE seconds, when the index is
+rebuilt from the database. Rebuilds run in a background thread while the
+old index keeps answering, changes of this process made meanwhile are
+replayed on the new index before it is swapped in.
+"""
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db import connections
+
+from user.models import UserProfile
+
+
+def normalize(text: str) -> str:
+    """Casefold, strip accents and collapse whitespace"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.casefold().split())
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.keys: list[str] = []
+        self.ids = array("q")
+        self.labels: dict[int, str] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def entries(name: str) -> list[str]:
+        """Index keys of a name, one starting at every word"""
+        words = normalize(name).split()
+        return [" ".join(words[index:]) for index in range(len(words))]
+
+    def _locate(self, key: str, profile_id: int) -> int:
+        """Position of (key, profile_id), entries are sorted by both"""
+        low = bisect_left(self.keys, key)
+        high = bisect_right(self.keys, key, low)
+        return bisect_left(self.ids, profile_id, low, high)
+
+    def _insert(self, key: str, profile_id: int) -> None:
+        position = self._locate(key, profile_id)
+        self.keys.insert(position, key)
+        self.ids.insert(position, profile_id)
+
+    def _remove(self, key: str, profile_id: int) -> None:
+        position = self._locate(key, profile_id)
+        if (
+            position < len(self.keys)
+            and self.keys[position] == key
+            and self.ids[position] == profile_id
+        ):
+            del self.keys[position]
+            del self.ids[position]
+
+    def load(self, profiles) -> None:
+        """Replace the index with (id, full name) pairs"""
+        entries, labels = [], {}
+        for profile_id, name in profiles:
+            labels[profile_id] = name
+            entries += [(key, profile_id) for key in self.entries(name)]
+        entries.sort()
+        with self.lock:
+            self.keys = [key for key, _ in entries]
+            self.ids = array("q", (profile_id for _, profile_id in entries))
+            self.labels = labels
+
+    def add(self, profile_id: int, name: str) -> None:
+        with self.lock:
+            self._discard(profile_id)
+            self.labels[profile_id] = name
+            for key in self.entries(name):
+                self._insert(key, profile_id)
+
+    def discard(self, profile_id: int) -> None:
+        with self.lock:
+            self._discard(profile_id)
+
+    def _discard(self, profile_id: int) -> None:
+        name = self.labels.pop(profile_id, None)
+        if name is not None:
+            for key in self.entries(name):
+                self._remove(key, profile_id)
+
+    def search(self, prefix: str, limit: int = 10) -> list[dict]:
+        """First limit profiles with a name word starting with prefix"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        found = []
+        with self.lock:
+            position = bisect_left(self.keys, prefix)
+            while (
+                len(found) < limit
+                and position < len(self.keys)
+                and self.keys[position].startswith(prefix)
+            ):
+                profile_id = self.ids[position]
+                if profile_id not in found:
+                    found.append(profile_id)
+                position += 1
+            return [
+                {"id": profile_id, "full_name": self.labels[profile_id]}
+                for profile_id in found
+            ]
+
+    def __len__(self):
+        return len(self.labels)
+
+
+_index = None
+_built_at = 0.0
+_build_lock = threading.Lock()
+_rebuilding = False
+# changes made while a rebuild runs, replayed on the new index
+_pending = []
+
+
+def build() -> PrefixIndex:
+    index = PrefixIndex()
+    index.load(
+        (profile_id, f"{first_name} {last_name}")
+        for profile_id, first_name, last_name in (
+            UserProfile.objects.order_by()
+            .values_list("id", "first_name", "last_name")
+            .iterator(chunk_size=5000)
+        )
+    )
+    return index
+
+
+def rebuild() -> None:
+    """Build a new index and swap it in, run in a background thread"""
+    global _index, _rebuilding
+    try:
+        index = build()
+        with _build_lock:
+            for change in _pending:
+                change(index)
+            _index = index
+    finally:
+        with _build_lock:
+            _pending.clear()
+            _rebuilding = False
+        connections.close_all()
+
+
+def get_index() -> PrefixIndex:
+    """Index of this process, built on first use and rebuilt when it got
+    old without making requests wait for the rebuild"""
+    global _index, _built_at, _rebuilding
+    with _build_lock:
+        if _index is None:
+            _index = build()
+            _built_at = time.monotonic()
+        elif (
+            not _rebuilding
+            and time.monotonic() - _built_at > settings.AUTOCOMPLETE_MAX_AGE
+        ):
+            _rebuilding = True
+            _built_at = time.monotonic()
+            threading.Thread(
+                target=rebuild,
+                name="autocomplete-rebuild",
+                daemon=True
+            ).start()
+        return _index
+
+
+def _apply(change) -> None:
+    """Apply a change to the index and to the one being rebuilt"""
+    with _build_lock:
+        if _rebuilding:
+            _pending.append(change)
+        index = _index
+    if index is not None:
+        change(index)
+
+
+def update(profile: UserProfile) -> None:
+    profile_id, name = profile.id, profile.full_name
+    _apply(lambda index: index.add(profile_id, name))
+
+
+def remove(profile_id: int) -> None:
+    _apply(lambda index: index.discard(profile_id))
+
+
+def search(prefix: str, limit: int = 10) -> list[dict]:
+    return get_index().search(prefix, limit)
@@ -0,0 +1,29 @@
+"""Stored follower counters of profiles.
+
+``UserProfile.followers_count`` and ``UserProfile.follow_to_count`` are
+changed with ``F()`` updates in the same transaction as the follow row,
+``actual_followers`` and ``actual_follow_to`` recount them from the rows.
+"""
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from user.models import UserFollowing
+
+
+def _count_rows(field):
+    rows = (
+        UserFollowing.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def actual_followers():
+    return _count_rows("you_follow_to")
+
+
+def actual_follow_to():
+    return _count_rows("your_followers")
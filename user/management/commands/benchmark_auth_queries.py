@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from social_media.management.commands._benchmark import (
+    create_profiles,
+    rolled_back,
+)
+from social_media.models import Commentary, Post
+from user import tokens
+from user.authentication import CachingTokenAuthentication
+from user.models import UserFollowing, UserProfile
+
+
+class Command(BaseCommand):
+    """Django command to count queries per request by authentication"""
+
+    help = (
+        "Count the queries of every GET endpoint with plain DRF token "
+        "lookups, cached tokens and signed access tokens "
+        "(rolled back afterwards)"
+    )
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            profile_id, other_id = create_profiles(2, "auth")
+            profile = UserProfile.objects.select_related("email").get(
+                pk=profile_id
+            )
+            profile.email.is_staff = True
+            profile.email.save()
+            token = Token.objects.create(user=profile.email)
+            post = Post.objects.create(
+                author=profile,
+                title="benchmark",
+                content="auth"
+            )
+            Commentary.objects.create(user=profile, post=post, content="auth")
+            UserFollowing.objects.create(
+                your_followers=profile,
+                you_follow_to_id=other_id
+            )
+
+            client = Client(
+                HTTP_AUTHORIZATION=f"Token {token.key}",
+                HTTP_ACCEPT="application/json"
+            )
+            signed_client = Client(
+                HTTP_AUTHORIZATION=f"Bearer {tokens.issue(profile.email)}",
+                HTTP_ACCEPT="application/json"
+            )
+            paths = [
+                reverse("user:profile"),
+                reverse("user:followers"),
+                reverse("user:followings"),
+                reverse("user:users-list"),
+                reverse("user:users-detail", args=[other_id]),
+                reverse("user:users-autocomplete") + "?q=auth",
+                reverse("user:following-history-list"),
+                reverse("social:posts-list"),
+                reverse("social:posts-detail", args=[post.id]),
+                reverse("social:your-post"),
+                reverse("social:following-post"),
+                reverse("social:own-commentary"),
+                reverse("social:like-post", args=[post.id]),
+                reverse("social:liked"),
+                reverse("social:trending-hashtags"),
+                reverse("social:comments-history-list"),
+                reverse("social:likes-history-list"),
+            ]
+
+            totals = [0, 0, 0]
+            self.stdout.write(
+                f"{'':<52} token / cached / signed access token"
+            )
+            for path in paths:
+                with mock.patch.object(
+                    CachingTokenAuthentication,
+                    "authenticate_credentials",
+                    TokenAuthentication.authenticate_credentials
+                ):
+                    before, status = self.count(client, path)
+                client.get(path)
+                signed_client.get(path)
+                counts = (
+                    before,
+                    self.count(client, path)[0],
+                    self.count(signed_client, path)[0],
+                )
+                totals = [
+                    total + count for total, count in zip(totals, counts)
+                ]
+                self.stdout.write(
+                    f"{path:<48} {status} "
+                    + " ".join(f"{count:>5}" for count in counts)
+                )
+            self.stdout.write(
+                f"{'total':<52} " + " ".join(f"{total:>5}" for total in totals)
+            )
+
+    @staticmethod
+    def count(client, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(path)
+        return len(queries), response.status_code
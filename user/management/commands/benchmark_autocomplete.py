@@ -0,0 +1,64 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.autocomplete import PrefixIndex
+
+
+class Command(BaseCommand):
+    """Django command to measure the name autocomplete index in memory"""
+
+    help = (
+        "Build the autocomplete prefix index over generated names and time "
+        "top-N prefix queries (no database access)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--names", type=int, default=1000000)
+        parser.add_argument("--queries", type=int, default=10000)
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+
+        def word():
+            return "".join(
+                random.choices(string.ascii_lowercase, k=random.randint(3, 9))
+            ).capitalize()
+
+        names = [
+            (profile_id, f"{word()} {word()}")
+            for profile_id in range(1, options["names"] + 1)
+        ]
+        index = PrefixIndex()
+        start = time.perf_counter()
+        index.load(names)
+        self.stdout.write(
+            f"build: {time.perf_counter() - start:.2f} s for "
+            f"{len(index)} names ({len(index.keys)} entries)"
+        )
+
+        for length in (1, 2, 3, 5):
+            prefixes = [
+                name[:length]
+                for _, name in random.choices(names, k=options["queries"])
+            ]
+            start = time.perf_counter()
+            for prefix in prefixes:
+                index.search(prefix, options["limit"])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"prefix length {length}: "
+                f"{elapsed / len(prefixes) * 1e6:8.2f} us per query"
+            )
+
+        start = time.perf_counter()
+        for profile_id in range(options["names"] + 1, options["names"] + 1001):
+            index.add(profile_id, f"{word()} {word()}")
+        self.stdout.write(
+            f"insert: {(time.perf_counter() - start) * 1000:8.2f} us "
+            f"per name"
+        )
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.utils import timezone
+
+from user import counters
+from user.models import UserProfile
+
+
+class Command(BaseCommand):
+    """Django command to repair drifted profile follower counters"""
+
+    help = (
+        "Recompute UserProfile.followers_count and "
+        "UserProfile.follow_to_count in batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted profiles"
+        )
+
+    def handle(self, *args, **options):
+        last_id, checked, repaired = 0, 0, 0
+        while True:
+            ids = list(
+                UserProfile.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            checked += len(ids)
+
+            drifted = list(
+                UserProfile.objects.filter(id__in=ids)
+                .annotate(
+                    actual_followers=counters.actual_followers(),
+                    actual_follow_to=counters.actual_follow_to()
+                )
+                .filter(
+                    ~Q(followers_count=F("actual_followers"))
+                    | ~Q(follow_to_count=F("actual_follow_to"))
+                )
+                .values_list("id", flat=True)
+            )
+            if drifted and not options["dry_run"]:
+                UserProfile.objects.filter(id__in=drifted).update(
+                    followers_count=counters.actual_followers(),
+                    follow_to_count=counters.actual_follow_to(),
+                    updated_at=timezone.now()
+                )
+            repaired += len(drifted)
+
+        action = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} profiles. {action} {repaired} drifted counters"
+        ))
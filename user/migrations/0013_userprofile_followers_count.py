@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:37
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_followers(apps, schema_editor):
+    UserProfile = apps.get_model("user", "UserProfile")
+    UserFollowing = apps.get_model("user", "UserFollowing")
+    followers = (
+        UserFollowing.objects.filter(you_follow_to=OuterRef("pk"))
+        .order_by()
+        .values("you_follow_to")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    UserProfile.objects.update(
+        followers_count=Coalesce(Subquery(followers), 0)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0012_alter_userfollowing_you_follow_to_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="followers_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_followers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0013_userprofile_followers_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userfollowing",
+            index=models.Index(
+                fields=["-created", "-id"], name="userfollowing_created_idx"
+            ),
+        ),
+    ]
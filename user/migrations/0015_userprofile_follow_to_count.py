@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_follow_to(apps, schema_editor):
+    UserProfile = apps.get_model("user", "UserProfile")
+    UserFollowing = apps.get_model("user", "UserFollowing")
+    follow_to = (
+        UserFollowing.objects.filter(your_followers=OuterRef("pk"))
+        .order_by()
+        .values("your_followers")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    UserProfile.objects.update(
+        follow_to_count=Coalesce(Subquery(follow_to), 0)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0014_userfollowing_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="follow_to_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_follow_to, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+FIELDS = ("first_name", "last_name", "city", "country")
+
+# icontains compares UPPER(column::text), index the same expression
+CREATE_INDEXES = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS userprofile_{field}_trgm_idx "
+    f"ON user_userprofile USING gin (UPPER({field}::text) gin_trgm_ops)"
+    for field in FIELDS
+]
+
+DROP_INDEXES = [
+    f"DROP INDEX CONCURRENTLY IF EXISTS userprofile_{field}_trgm_idx"
+    for field in FIELDS
+]
+
+
+def run_on_postgres(statements):
+    """Trigram indexes only exist on PostgreSQL"""
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            for sql in statements:
+                schema_editor.execute(sql, params=None)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("user", "0015_userprofile_follow_to_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_postgres(CREATE_INDEXES),
+            run_on_postgres(DROP_INDEXES),
+        ),
+    ]
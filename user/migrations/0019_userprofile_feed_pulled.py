@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def flag_celebrities(apps, schema_editor):
+    """Keep pulling the authors that were pulled by their follower count"""
+    UserProfile = apps.get_model("user", "UserProfile")
+    UserProfile.objects.filter(
+        followers_count__gte=settings.FEED_CELEBRITY_THRESHOLD
+    ).update(feed_pulled=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0018_accesstokenrevocation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="feed_pulled",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(flag_celebrities, migrations.RunPython.noop),
+    ]
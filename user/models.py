@@ -91,6 +91,11 @@ class UserProfile(models.Model):
         upload_to=user_image_file_path
     )
     registered_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    followers_count = models.PositiveIntegerField(default=0)
+    follow_to_count = models.PositiveIntegerField(default=0)
+    # posts are pulled on read instead of fanned out, see social_media.timeline
+    feed_pulled = models.BooleanField(default=False)
 
     class Meta:
         verbose_name_plural = "profiles"
@@ -102,11 +107,11 @@ class UserProfile(models.Model):
 
     @property
     def total_followers(self):
-        return self.following.count()
+        return self.followers_count
 
     @property
     def total_follow_to(self):
-        return self.followers.count()
+        return self.follow_to_count
 
     def __str__(self):
         return f"{self.full_name}, email: {self.email}"
@@ -133,8 +138,34 @@ class UserFollowing(models.Model):
                 name="unique_followers"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["-created", "-id"],
+                name="userfollowing_created_idx"
+            )
+        ]
 
         ordering = ["-created"]
 
     def __str__(self):
         return f"{self.you_follow_to} follows {self.your_followers}"
+
+
+class AccessTokenRevocation(models.Model):
+    """Access tokens of user issued until revoked_at are revoked"""
+
+    user = models.ForeignKey(
+        User,
+        related_name="+",
+        on_delete=models.CASCADE
+    )
+    # milliseconds since the epoch, like the issue time of a token
+    revoked_at = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["revoked_at"],
+                name="revocation_revoked_at_idx"
+            )
+        ]
@@ -0,0 +1,42 @@
+"""Trigram search over the user directory.
+
+On PostgreSQL migration 0016 adds pg_trgm GIN indexes on the upper-cased
+first_name, last_name, city and country, the expressions Django compares
+in ``icontains`` lookups, so the directory filters become index scans.
+``?q=`` matches names with the trigram ``%`` operator on the same
+indexes and ranks them by similarity. Other databases fall back to
+``icontains`` on every word of the query with a constant rank.
+"""
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.functions import Greatest, Upper
+
+from pagination import cursor_rank
+
+NAME_FIELDS = ("first_name", "last_name")
+
+
+def is_supported() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def search_profiles(queryset: QuerySet, text: str) -> QuerySet:
+    """Filter profiles with names similar to text, annotated with rank"""
+    if not is_supported():
+        for word in text.split():
+            queryset = queryset.filter(
+                Q(first_name__icontains=word) | Q(last_name__icontains=word)
+            )
+        return queryset.annotate(rank=cursor_rank())
+
+    text = text.upper()
+    matches = Q()
+    for field in NAME_FIELDS:
+        matches |= Q(TrigramSimilar(Upper(field), text))
+    return queryset.filter(matches).annotate(
+        rank=cursor_rank(Greatest(*(
+            TrigramSimilarity(Upper(field), text) for field in NAME_FIELDS
+        )))
+    )
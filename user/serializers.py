@@ -2,6 +2,10 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import gettext as _
 from django.core import exceptions
+from rest_framework.authtoken.models import Token
+
+from projection import ValuesSerializer
+from update_fields import UpdateFieldsMixin
 from user.models import UserProfile, User, UserFollowing
 
 
@@ -128,7 +132,27 @@ class AuthTokenSerializer(serializers.Serializer):
         return data
 
 
-class UserProfilePhotoSerializer(serializers.ModelSerializer):
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+    def validate(self, data):
+        token = (
+            Token.objects.select_related("user__profile")
+            .filter(key=data["refresh"])
+            .first()
+        )
+        if token is None or not token.user.is_active:
+            msg = _("Invalid refresh token.")
+            raise serializers.ValidationError(msg)
+
+        data["user"] = token.user
+        return data
+
+
+class UserProfilePhotoSerializer(
+    UpdateFieldsMixin,
+    serializers.ModelSerializer
+):
     class Meta:
         model = UserProfile
         fields = ("id", "photo")
@@ -141,6 +165,22 @@ class UserFollowingSerializer(serializers.ModelSerializer):
         fields = ("id", "your_followers", "you_follow_to", "created")
 
 
+class FollowingHistorySerializer(ValuesSerializer):
+    """UserFollowingSerializer rows for the admin history list"""
+
+    id = serializers.IntegerField(read_only=True)
+    your_followers = serializers.IntegerField(read_only=True)
+    you_follow_to = serializers.IntegerField(read_only=True)
+    created = serializers.DateTimeField(read_only=True)
+
+    columns = {
+        "id": "id",
+        "your_followers": "your_followers_id",
+        "you_follow_to": "you_follow_to_id",
+        "created": "created",
+    }
+
+
 class FollowingSerializer(UserFollowingSerializer):
     photo = serializers.ImageField(
         source="you_follow_to.photo",
@@ -201,7 +241,7 @@ class FollowersSerializer(UserFollowingSerializer):
         fields = ("photo", "user_id", "full_name", "city", "followers_since")
 
 
-class UserOwnProfileSerializer(UserProfileSerializer):
+class UserOwnProfileSerializer(UpdateFieldsMixin, UserProfileSerializer):
     email = serializers.EmailField(read_only=True)
 
     class Meta:
@@ -241,3 +281,24 @@ class UserProfileDetailSerializer(UserProfileSerializer):
             "total_followers",
             "total_follow_to",
         )
+
+
+class UserProfileBatchSerializer(serializers.Serializer):
+    results = UserProfileDetailSerializer(many=True, read_only=True)
+    missing = serializers.ListField(
+        child=serializers.IntegerField(),
+        read_only=True
+    )
+
+
+class BulkFollowSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500
+    )
+
+
+class AutocompleteSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    full_name = serializers.CharField(read_only=True)
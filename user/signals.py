@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from user import authentication, autocomplete
+from user.models import User, UserFollowing, UserProfile
+
+
+@receiver(post_save, sender=UserProfile)
+def index_profile_name(sender, instance, raw, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: autocomplete.update(instance))
+
+
+@receiver(post_delete, sender=UserProfile)
+def unindex_profile_name(sender, instance, **kwargs):
+    profile_id = instance.id
+    transaction.on_commit(lambda: autocomplete.remove(profile_id))
+
+
+@receiver(pre_delete, sender=UserProfile)
+def release_follow_counters(sender, instance, **kwargs):
+    """Follow rows of a deleted profile go with it through CASCADE, take
+    them off the counters of the profiles on their other side"""
+    followed = UserFollowing.objects.filter(
+        your_followers=instance
+    ).values_list("you_follow_to_id", flat=True)
+    followers = UserFollowing.objects.filter(
+        you_follow_to=instance
+    ).values_list("your_followers_id", flat=True)
+    # locked in id order like the follow views, then read again so
+    # follow changes committed meanwhile are counted once
+    list(
+        UserProfile.objects.select_for_update(no_key=True)
+        .filter(id__in={instance.pk, *followed.all(), *followers.all()})
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    now = timezone.now()
+    UserProfile.objects.filter(id__in=followed).update(
+        followers_count=F("followers_count") - 1,
+        updated_at=now
+    )
+    UserProfile.objects.filter(id__in=followers).update(
+        follow_to_count=F("follow_to_count") - 1,
+        updated_at=now
+    )
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: authentication.invalidate(key))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def forget_user_tokens(sender, instance, **kwargs):
+    """Cached tokens carry the user and profile, drop them on changes"""
+    user_id = instance.id if sender is User else instance.email_id
+    keys = list(
+        Token.objects.filter(user_id=user_id).values_list("key", flat=True)
+    )
+    if keys:
+        transaction.on_commit(lambda: authentication.invalidate(*keys))
@@ -0,0 +1,130 @@
+"""Short-lived signed access tokens.
+
+An access token is the signed (HMAC with SECRET_KEY) user id, profile
+id, staff flag and issue time, valid for ACCESS_TOKEN_LIFETIME seconds.
+Verifying it needs neither the database nor the cache. The DRF Token of
+the user acts as the long-lived refresh token that stays in the database.
+
+Logout revokes every access token of the user issued until that moment.
+Revocations are held in a small in-process list that forgets them once
+the tokens they cover have expired, and are stored as
+``AccessTokenRevocation`` rows. Every process pulls the rows of the last
+ACCESS_TOKEN_LIFETIME at most every ACCESS_TOKEN_REVOCATION_SYNC seconds,
+which bounds how long a revoked token can still be used there. Rows are
+deleted once the tokens they cover have expired.
+"""
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+
+from user.models import AccessTokenRevocation, User, UserProfile
+
+SALT = "user.access-token"
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def issue(user: User) -> str:
+    try:
+        profile_id = user.profile.id
+    except UserProfile.DoesNotExist:
+        profile_id = None
+    return signing.dumps(
+        {"u": user.id, "p": profile_id, "s": user.is_staff, "t": now_ms()},
+        salt=SALT
+    )
+
+
+def access_response(user: User) -> dict:
+    return {
+        "access": issue(user),
+        "expires_in": settings.ACCESS_TOKEN_LIFETIME,
+    }
+
+
+def verify(token: str) -> dict:
+    """Claims of a valid token, raises signing.BadSignature otherwise"""
+    return signing.loads(
+        token,
+        salt=SALT,
+        max_age=settings.ACCESS_TOKEN_LIFETIME
+    )
+
+
+class RevocationList:
+    """Users whose access tokens issued until some moment are revoked"""
+
+    def __init__(self):
+        self.revoked: dict[int, int] = {}
+        self.expiry: list[tuple[int, int]] = []
+        self.synced_at = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, user_id: int, moment: int) -> None:
+        with self.lock:
+            self._add(user_id, moment)
+
+    def _add(self, user_id: int, moment: int) -> None:
+        if moment > self.revoked.get(user_id, -1):
+            self.revoked[user_id] = moment
+            expires = moment + settings.ACCESS_TOKEN_LIFETIME * 1000
+            heapq.heappush(self.expiry, (expires, user_id))
+
+    def _purge(self) -> None:
+        current = now_ms()
+        while self.expiry and self.expiry[0][0] < current:
+            expires, user_id = heapq.heappop(self.expiry)
+            moment = self.revoked.get(user_id)
+            if (
+                moment is not None
+                and moment + settings.ACCESS_TOKEN_LIFETIME * 1000 == expires
+            ):
+                del self.revoked[user_id]
+
+    def is_revoked(self, user_id: int, issued: int) -> bool:
+        if (
+            time.monotonic() - self.synced_at
+            > settings.ACCESS_TOKEN_REVOCATION_SYNC
+        ):
+            self.sync()
+        with self.lock:
+            self._purge()
+            return self.revoked.get(user_id, -1) >= issued
+
+    def sync(self) -> None:
+        """Pull the revocations of tokens that have not expired yet"""
+        rows = list(
+            AccessTokenRevocation.objects.filter(
+                revoked_at__gte=expired_before()
+            ).values_list("user_id", "revoked_at")
+        )
+        with self.lock:
+            for user_id, moment in rows:
+                self._add(user_id, moment)
+            self.synced_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.revoked)
+
+
+revocations = RevocationList()
+
+
+def expired_before() -> int:
+    """Tokens issued before this moment have expired"""
+    return now_ms() - settings.ACCESS_TOKEN_LIFETIME * 1000
+
+
+def revoke(user_id: int) -> None:
+    """Revoke the access tokens of a user issued until now"""
+    moment = now_ms()
+    AccessTokenRevocation.objects.create(user_id=user_id, revoked_at=moment)
+    AccessTokenRevocation.objects.filter(
+        revoked_at__lt=expired_before()
+    ).delete()
+    revocations.add(user_id, moment)
@@ -4,6 +4,7 @@ from django.urls import path, include
 from user.views import (
     CreateUserView,
     CreateTokenView,
+    RefreshAccessTokenView,
     LogoutView,
     UserProfileViewSet,
     UserFollowingViewSet,
@@ -26,6 +27,11 @@ router.register(
 urlpatterns = [
     path("register/", CreateUserView.as_view(), name="create"),
     path("login/", CreateTokenView.as_view(), name="login"),
+    path(
+        "token/refresh/",
+        RefreshAccessTokenView.as_view(),
+        name="token-refresh"
+    ),
     path("logout/", LogoutView.as_view(), name="logout"),
     path("profile/", ManageUserView .as_view(), name="profile"),
     path("profile/followers/", UserFollowers.as_view(), name="followers"),
@@ -1,7 +1,11 @@
 from rest_framework import generics
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.permissions import (
+    IsAuthenticated,
+    IsAdminUser,
+    SAFE_METHODS,
+)
 from rest_framework.settings import api_settings
 from rest_framework import status, viewsets
 from rest_framework.response import Response
@@ -12,9 +16,18 @@ from django.db.models.query import QuerySet
 from rest_framework.decorators import action, api_view
 from rest_framework.reverse import reverse
 from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 
+from conditional import ConditionalGetMixin, digest_etag
 from pagination import FollowingPagination, UserProfilesPagination
+from renderers import StreamingListMixin, is_streaming
+from social_media import timeline
+from social_media.views import BATCH_PARAMETER, batch_ids
+from user import autocomplete, search, tokens
+from user.authentication import API_AUTHENTICATION_CLASSES
 from social_media.permissions import (
     AnonPermissionOnly,
     IsOwnerOrReadOnlyUserProfile
@@ -27,10 +40,14 @@ from user.serializers import (
     UserProfileListSerializer,
     UserProfileDetailSerializer,
     UserOwnProfileSerializer,
-    UserFollowingSerializer,
     UserProfilePhotoSerializer,
     FollowersSerializer,
-    FollowingSerializer
+    FollowingSerializer,
+    FollowingHistorySerializer,
+    UserProfileBatchSerializer,
+    BulkFollowSerializer,
+    AutocompleteSerializer,
+    RefreshTokenSerializer
 )
 
 
@@ -99,16 +116,99 @@ def api_root(request, format=None):
     })
 
 
+def lock_follows(user: UserProfile, profile_ids) -> None:
+    """Lock the profiles whose counters a follow change updates.
+
+    The user and every target are locked in one statement ordered by id,
+    so two users following each other wait for one another instead of
+    deadlocking. FOR NO KEY UPDATE still lets the foreign key checks of
+    follow inserts pointing at these rows through.
+    """
+    list(
+        UserProfile.objects.select_for_update(no_key=True)
+        .filter(id__in={user.pk, *profile_ids})
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+def change_follow_counters(user: UserProfile, profile_ids, delta: int):
+    now = timezone.now()
+    UserProfile.objects.filter(id__in=profile_ids).update(
+        followers_count=F("followers_count") + delta,
+        updated_at=now
+    )
+    UserProfile.objects.filter(pk=user.pk).update(
+        follow_to_count=F("follow_to_count") + delta * len(profile_ids),
+        updated_at=now
+    )
+    if delta > 0:
+        timeline.pull_celebrities(profile_ids)
+
+
+def follow_profiles(user: UserProfile, ids) -> list[int]:
+    """Follow every existing profile in ids in one transaction.
+
+    Already followed profiles are skipped, bulk_create ignores conflicts
+    on unique_followers. Returns the ids followed by this call.
+    """
+    ids = set(ids) - {user.id}
+    with transaction.atomic():
+        lock_follows(user, ids)
+        existing = UserFollowing.objects.filter(
+            your_followers=user,
+            you_follow_to_id__in=ids
+        ).values_list("you_follow_to_id", flat=True)
+        followed = sorted(
+            UserProfile.objects.filter(id__in=ids - set(existing))
+            .values_list("id", flat=True)
+        )
+        UserFollowing.objects.bulk_create(
+            [
+                UserFollowing(your_followers=user, you_follow_to_id=pk)
+                for pk in followed
+            ],
+            ignore_conflicts=True
+        )
+        change_follow_counters(user, followed, 1)
+    if followed:
+        timeline.backfill(user.id, followed)
+    return followed
+
+
+def unfollow_profiles(user: UserProfile, ids) -> list[int]:
+    """Unfollow every profile in ids, returns the ids actually unfollowed"""
+    with transaction.atomic():
+        lock_follows(user, ids)
+        connections = UserFollowing.objects.filter(
+            your_followers=user,
+            you_follow_to_id__in=ids
+        )
+        unfollowed = sorted(
+            connections.values_list("you_follow_to_id", flat=True)
+        )
+        connections.delete()
+        change_follow_counters(user, unfollowed, -1)
+    if unfollowed:
+        timeline.prune(user.id, unfollowed)
+    return unfollowed
+
+
 def following_user(request, pk: int, format=None):
     user = request.user.profile
     follow = get_object_or_404(UserProfile, pk=pk)
 
     if user == follow:
         return Response({"message": "You can't subscribe on your self"})
-    if user.id in [
-        follower.your_followers_id
-        for follower in follow.following.all()
-    ]:
+    try:
+        with transaction.atomic():
+            lock_follows(user, [follow.id])
+            UserFollowing.objects.create(
+                you_follow_to=follow,
+                your_followers=user
+            )
+            change_follow_counters(user, [follow.id], 1)
+    except IntegrityError:
         return Response(
             {
                 "message": (f"You already "
@@ -116,18 +216,13 @@ def following_user(request, pk: int, format=None):
                             f"{follow.last_name}")
             }
         )
-    UserFollowing.objects.create(you_follow_to=follow, your_followers=user)
-
-    serializer = UserProfileDetailSerializer(follow)
-    first_name = serializer.data["first_name"]
-    last_name = serializer.data["last_name"]
-    user_id = serializer.data["id"]
+    timeline.backfill(user.id, [follow.id])
 
     return Response(
         {
             "message": (f"You successful subscribe "
-                        f"on {first_name} {last_name} "
-                        f"(user_id: {user_id})")
+                        f"on {follow.first_name} {follow.last_name} "
+                        f"(user_id: {follow.id})")
         }
     )
 
@@ -136,53 +231,120 @@ def unfollowing_user(request, pk: int, format=None):
     user = request.user.profile
     follow = get_object_or_404(UserProfile, pk=pk)
 
-    connection = UserFollowing.objects.filter(
-        you_follow_to=follow,
-        your_followers=user
-    ).first()
-    if connection:
-        connection.delete()
-        serializer = UserProfileSerializer(follow)
-        first_name = serializer.data["first_name"]
-        last_name = serializer.data["last_name"]
-        user_id = serializer.data["id"]
+    with transaction.atomic():
+        lock_follows(user, [follow.id])
+        deleted, _ = UserFollowing.objects.filter(
+            you_follow_to=follow,
+            your_followers=user
+        ).delete()
+        if deleted:
+            change_follow_counters(user, [follow.id], -1)
+    if deleted:
+        timeline.prune(user.id, [follow.id])
         return Response(
             {
                 "message": (f"You successful unsubscribe "
-                            f"from {first_name} {last_name} "
-                            f"(user_id: {user_id})")
+                            f"from {follow.first_name} {follow.last_name} "
+                            f"(user_id: {follow.id})")
                          }
         )
     return Response({"message": "You are not followers"})
 
 
-class ManageUserView(generics.RetrieveUpdateDestroyAPIView):
+def profile_validators(
+    kind: str,
+    profile_id,
+    updated_at
+) -> tuple[str | None, int | None]:
+    if updated_at is None:
+        return None, None
+    return (
+        digest_etag(kind, profile_id, updated_at),
+        int(updated_at.timestamp())
+    )
+
+
+class ManageUserView(
+    ConditionalGetMixin,
+    generics.RetrieveUpdateDestroyAPIView
+):
     queryset = UserProfile.objects.all()
     serializer_class = UserOwnProfileSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     permission_classes = (IsAuthenticated,)
+    updated_at = None
+
+    def get_validators(self):
+        profile_id = self.request.user.profile.pk
+        self.updated_at = UserProfile.objects.filter(
+            pk=profile_id
+        ).values_list("updated_at", flat=True).first()
+        return profile_validators("own-profile", profile_id, self.updated_at)
 
     def get_object(self):
-        return self.request.user.profile
+        profile = self.request.user.profile
+        if (
+            profile.get_deferred_fields()
+            or self.request.method not in SAFE_METHODS
+            or (
+                self.updated_at is not None
+                and profile.updated_at != self.updated_at
+            )
+        ):
+            # profiles of signed access tokens only carry their ids and
+            # cached token profiles may miss counter updates, writes
+            # always start from the stored row
+            profile = UserProfile.objects.select_related("email").get(
+                pk=profile.pk
+            )
+        return profile
 
 
 class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     permission_classes = (AnonPermissionOnly,)
 
 
 class CreateTokenView(ObtainAuthToken):
+    """Issue the database token and a short-lived signed access token.
+
+    The token works with "Authorization: Token <token>" and doubles as
+    the refresh token for new access tokens ("Bearer <access>").
+    """
+
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
     serializer_class = AuthTokenSerializer
 
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data["user"]
+        token, created = Token.objects.get_or_create(user=user)
+        return Response({"token": token.key, **tokens.access_response(user)})
+
+
+class RefreshAccessTokenView(generics.GenericAPIView):
+    authentication_classes = ()
+    permission_classes = ()
+    serializer_class = RefreshTokenSerializer
+
+    def post(self, request, format=None):
+        """New signed access token for a refresh (database) token"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            tokens.access_response(serializer.validated_data["user"])
+        )
+
 
 class LogoutView(APIView):
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     permission_classes = (IsAuthenticated,)
 
     def get(self, request, format=None):
-        request.user.auth_token.delete()
+        tokens.revoke(request.user.id)
+        Token.objects.filter(user_id=request.user.id).delete()
         return Response(
             {
                 "message": ("Logout successful,"
@@ -192,23 +354,37 @@ class LogoutView(APIView):
 
 
 class UserProfileViewSet(
+    StreamingListMixin,
+    ConditionalGetMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = UserProfile.objects.prefetch_related("followers", "following")
+    queryset = UserProfile.objects.all()
     serializer_class = UserProfileSerializer
     permission_classes = (IsOwnerOrReadOnlyUserProfile,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     pagination_class = UserProfilesPagination
+    profile_page = None
+    profile_batch = None
+
+    @property
+    def cursor_ordering(self):
+        """Name searches are paginated by similarity, other lists by id"""
+        if self.request.query_params.get("q"):
+            return ("-rank", "id")
+        return None
 
     def get_queryset(self) -> QuerySet:
         queryset = self.queryset
+        q = self.request.query_params.get("q")
         age = self.request.query_params.get("age")
         first_name = self.request.query_params.get("first_name")
         last_name = self.request.query_params.get("last_name")
         city = self.request.query_params.get("city")
         country = self.request.query_params.get("country")
+        if q:
+            queryset = search.search_profiles(queryset, q)
         if age is not None:
             queryset = queryset.filter(age__exact=age)
         if first_name is not None:
@@ -225,12 +401,58 @@ class UserProfileViewSet(
     def get_serializer_class(self):
         if self.action == "list":
             return UserProfileListSerializer
-        if self.action == "retrieve":
+        if self.action in ("retrieve", "batch"):
             return UserProfileDetailSerializer
         if self.action == "upload_photo":
             return UserProfilePhotoSerializer
+        if self.action == "bulk_follow":
+            return BulkFollowSerializer
+        if self.action == "autocomplete":
+            return AutocompleteSerializer
         return UserProfileSerializer
 
+    def get_validators(self):
+        """Detail by the stamp of the profile, lists by their page rows"""
+        if self.action == "retrieve":
+            profile_id = self.kwargs["pk"]
+            updated_at = UserProfile.objects.filter(
+                pk=profile_id
+            ).values_list("updated_at", flat=True).first()
+            return profile_validators("profile", profile_id, updated_at)
+        if self.action == "list":
+            self.profile_page = self.paginate_queryset(
+                self.filter_queryset(self.get_queryset())
+            )
+            return digest_etag(
+                "profiles",
+                [
+                    (profile.id, profile.updated_at)
+                    for profile in self.profile_page
+                ],
+                self.paginator.has_next
+            ), None
+        if self.action == "batch":
+            return digest_etag(
+                "profiles",
+                [
+                    (profile.id, profile.updated_at)
+                    for profile in self.get_profile_batch()
+                ]
+            ), None
+        return None, None
+
+    def get_profile_batch(self) -> list[UserProfile]:
+        """Profiles of the ids parameter in its order, from one query"""
+        if self.profile_batch is None:
+            ids = batch_ids(self.request)
+            profiles = UserProfile.objects.in_bulk(ids)
+            self.profile_batch = [
+                profiles[profile_id]
+                for profile_id in ids
+                if profile_id in profiles
+            ]
+        return self.profile_batch
+
     @action(
         methods=["GET", "PUT"],
         detail=True,
@@ -248,6 +470,27 @@ class UserProfileViewSet(
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(
+        parameters=[BATCH_PARAMETER],
+        responses=UserProfileBatchSerializer,
+    )
+    @action(methods=["GET"], detail=False)
+    def batch(self, request, format=None):
+        """Profiles by id in the requested order and the ids not found"""
+        profiles = self.get_profile_batch()
+        found = {profile.id for profile in profiles}
+        serializer = self.get_serializer(profiles, many=True)
+        return Response(
+            {
+                "results": serializer.data,
+                "missing": [
+                    profile_id
+                    for profile_id in batch_ids(request)
+                    if profile_id not in found
+                ]
+            }
+        )
+
     @action(
         methods=["GET", "POST"],
         detail=True,
@@ -264,8 +507,76 @@ class UserProfileViewSet(
     def unfollow_user(self, request, pk, format=None):
         return unfollowing_user(request, pk, format=None)
 
+    @action(
+        methods=["POST", "DELETE"],
+        detail=False,
+        url_path="bulk-follow",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_follow(self, request, format=None):
+        """Follow (POST) or unfollow (DELETE) a list of profile ids at once"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data["ids"])
+        user = request.user.profile
+
+        if request.method == "POST":
+            followed = follow_profiles(user, ids)
+            return Response(
+                {
+                    "followed": followed,
+                    "skipped": sorted(ids - set(followed))
+                }
+            )
+        unfollowed = unfollow_profiles(user, ids)
+        return Response(
+            {
+                "unfollowed": unfollowed,
+                "skipped": sorted(ids - set(unfollowed))
+            }
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                description=("Start of any word of the full name "
+                             "(ex. ?q=ol)"),
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Number of names, at most 50 (ex. ?limit=5)",
+            ),
+        ],
+        responses=AutocompleteSerializer(many=True),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[IsAuthenticated],
+    )
+    def autocomplete(self, request, format=None):
+        """Profiles whose names start with q, served from memory"""
+        try:
+            limit = min(max(int(request.query_params["limit"]), 1), 50)
+        except (KeyError, ValueError):
+            limit = 10
+        serializer = self.get_serializer(
+            autocomplete.search(request.query_params.get("q", ""), limit),
+            many=True
+        )
+        return Response(serializer.data)
+
     @extend_schema(
         parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                description=("Search by first and last name, most similar "
+                             "names first (ex. ?q=Antony Bulb)"),
+            ),
             OpenApiParameter(
                 "age",
                 type=OpenApiTypes.INT,
@@ -295,19 +606,32 @@ class UserProfileViewSet(
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        if self.profile_page is None or is_streaming(request):
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_serializer(self.profile_page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def iterate_page(self):
+        if self.profile_page is None:
+            return super().iterate_page()
+        return iter(self.profile_page)
 
 
-class UserFollowingViewSet(mixins.ListModelMixin, GenericViewSet):
+class UserFollowingViewSet(
+    StreamingListMixin,
+    mixins.ListModelMixin,
+    GenericViewSet
+):
     permission_classes = (IsAdminUser,)
-    serializer_class = UserFollowingSerializer
-    queryset = UserFollowing.objects.all()
+    authentication_classes = API_AUTHENTICATION_CLASSES
+    serializer_class = FollowingHistorySerializer
+    queryset = FollowingHistorySerializer.project(UserFollowing.objects.all())
     pagination_class = FollowingPagination
 
 
 class UserFollowers(generics.ListAPIView):
     serializer_class = FollowersSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
@@ -321,7 +645,7 @@ class UserFollowers(generics.ListAPIView):
 
 class UserFollowings(generics.ListAPIView):
     serializer_class = FollowingSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
@@ -334,7 +658,7 @@ class UserFollowings(generics.ListAPIView):
 
 class UserFollow(APIView):
     permission_classes = (IsAuthenticated,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = API_AUTHENTICATION_CLASSES
 
     def get_object(self, pk):
         return get_object_or_404(UserProfile, pk=pk)